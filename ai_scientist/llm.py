@@ -1,6 +1,7 @@
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from ai_scientist.utils.token_tracker import track_token_usage
 
@@ -150,21 +151,26 @@ def get_batch_responses_from_llm(
         new_msg_history = [
             new_msg_history + [{"role": "assistant", "content": c}] for c in content
         ]
-    # DeepSeek models don't support n > 1, so they fall back to the loop below
+    # DeepSeek models don't support n > 1, so they fall back to independent
+    # requests below, issued concurrently so the samples share one round trip
     else:
-        content, new_msg_history = [], []
-        for _ in range(n_responses):
-            c, hist = get_response_from_llm(
-                msg,
-                client,
-                model,
-                system_message,
-                print_debug=False,
-                msg_history=None,
-                temperature=temperature,
-            )
-            content.append(c)
-            new_msg_history.append(hist)
+        with ThreadPoolExecutor(max_workers=max(1, n_responses)) as executor:
+            futures = [
+                executor.submit(
+                    get_response_from_llm,
+                    msg,
+                    client,
+                    model,
+                    system_message,
+                    print_debug=False,
+                    msg_history=None,
+                    temperature=temperature,
+                )
+                for _ in range(n_responses)
+            ]
+            results = [f.result() for f in futures]
+        content = [c for c, _ in results]
+        new_msg_history = [hist for _, hist in results]
 
     if print_debug:
         # Just print the first one.
@@ -447,7 +453,9 @@ def extract_json_between_markers(llm_output: str) -> dict | None:
     return None  # No valid JSON found
 
 
-def create_client(model) -> tuple[Any, str]:
+def create_client(model, http_client=None) -> tuple[Any, str]:
+    # http_client: optional shared httpx.Client for the OpenAI-compatible
+    # clients, so several models can reuse one keep-alive connection pool.
     if model.startswith("claude-"):
         print(f"Using Anthropic API with model {model}.")
         return anthropic.Anthropic(), model
@@ -461,16 +469,17 @@ def create_client(model) -> tuple[Any, str]:
         return anthropic.AnthropicVertex(), client_model
     elif "gpt" in model:
         print(f"Using OpenAI API with model {model}.")
-        return openai.OpenAI(), model
+        return openai.OpenAI(http_client=http_client), model
     elif "o1" in model or "o3" in model:
         print(f"Using OpenAI API with model {model}.")
-        return openai.OpenAI(), model
+        return openai.OpenAI(http_client=http_client), model
     elif model == "deepseek-coder-v2-0724":
         print(f"Using OpenAI API with {model}.")
         return (
             openai.OpenAI(
                 api_key=os.environ["DEEPSEEK_API_KEY"],
                 base_url="https://api.deepseek.com",
+                http_client=http_client,
             ),
             model,
         )
@@ -483,6 +492,7 @@ def create_client(model) -> tuple[Any, str]:
             openai.OpenAI(
                 api_key=os.environ["HUGGINGFACE_API_KEY"],
                 base_url="https://api-inference.huggingface.co/models/agentica-org/DeepCoder-14B-Preview",
+                http_client=http_client,
             ),
             model,
         )
@@ -492,6 +502,7 @@ def create_client(model) -> tuple[Any, str]:
             openai.OpenAI(
                 api_key=os.environ["OPENROUTER_API_KEY"],
                 base_url="https://openrouter.ai/api/v1",
+                http_client=http_client,
             ),
             "meta-llama/llama-3.1-405b-instruct",
         )
@@ -501,6 +512,7 @@ def create_client(model) -> tuple[Any, str]:
             openai.OpenAI(
                 api_key=os.environ["GEMINI_API_KEY"],
                 base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+                http_client=http_client,
             ),
             model,
         )
@@ -510,6 +522,7 @@ def create_client(model) -> tuple[Any, str]:
             openai.OpenAI(
                 api_key=os.environ["DEEPSEEK_API_KEY"],
                 base_url="https://api.deepseek.com",
+                http_client=http_client,
             ),
             model,
         )
@@ -519,6 +532,7 @@ def create_client(model) -> tuple[Any, str]:
             openai.OpenAI(
                 api_key=os.environ["DEEPSEEK_API_KEY"],
                 base_url="https://api.deepseek.com",
+                http_client=http_client,
             ),
             model,
         )
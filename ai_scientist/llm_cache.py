@@ -0,0 +1,107 @@
+"""Content-addressed on-disk cache for LLM responses."""
+
+import functools
+import hashlib
+import json
+import os
+import os.path as osp
+from typing import Any, Optional
+
+
+class FileCache:
+    """One JSON file per key under ``cache_dir``."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return osp.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        # Write to a temp file first so an interrupted run never leaves a
+        # truncated entry behind.
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+
+class PromptCache:
+    """Exact cache keyed on the full request, sampled calls included.
+
+    Any change to the prompt, system message or history is a miss, so it is
+    safe for multi-round loops whose prompts share a long common prefix.
+    """
+
+    def __init__(self, cache_dir: str, label: str = "LLM"):
+        self.disk = FileCache(cache_dir)
+        self.label = label
+
+    @staticmethod
+    def _key(model, prompt, context) -> str:
+        return hashlib.sha256(
+            f"{model}\0{prompt}\0{context}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, model, prompt, context) -> Optional[Any]:
+        cached = self.disk.get(self._key(model, prompt, context))
+        if cached is None:
+            return None
+        print(f"💾 {self.label} cache hit")
+        return cached["response"]
+
+    def set(self, model, prompt, context, response) -> None:
+        self.disk.set(self._key(model, prompt, context), {"response": response})
+
+    def wrap(self, fn):
+        """Wrap a get_response_from_llm-compatible function."""
+
+        @functools.wraps(fn)
+        def wrapper(
+            prompt,
+            client,
+            model,
+            system_message,
+            print_debug=False,
+            msg_history=None,
+            temperature=0.7,
+        ):
+            context = json.dumps(
+                {
+                    "system": system_message,
+                    "history": msg_history or [],
+                    "temperature": temperature,
+                },
+                sort_keys=True,
+                default=str,
+            )
+            cached = self.get(model, prompt, context)
+            if cached is not None:
+                return cached["content"], cached["msg_history"]
+            content, new_msg_history = fn(
+                prompt,
+                client,
+                model,
+                system_message,
+                print_debug=print_debug,
+                msg_history=msg_history,
+                temperature=temperature,
+            )
+            self.set(
+                model,
+                prompt,
+                context,
+                {"content": content, "msg_history": new_msg_history},
+            )
+            return content, new_msg_history
+
+        return wrapper
@@ -1,12 +1,27 @@
 import argparse
+import asyncio
+import contextlib
+import errno
+import functools
+import hashlib
 import json
 import os
 import os.path as osp
 import re
 import shutil
+import sqlite3
+import string
 import subprocess
+import tempfile
+import threading
 import traceback
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from ai_scientist.llm import (
     get_response_from_llm,
@@ -15,68 +30,409 @@ from ai_scientist.llm import (
     AVAILABLE_LLMS,
 )
 
-from ai_scientist.perform_vlm_review import generate_vlm_img_review
+from ai_scientist.perform_vlm_review import VLM_MAX_WORKERS, generate_vlm_img_review
 from ai_scientist.vlm import create_client as create_vlm_client
 
+_LATEX_BLOCK_RE = re.compile(r"```latex(.*?)```", re.DOTALL)
+_CLEAN_ALLOWED = frozenset(string.ascii_lowercase + string.digits + ":_@{},-")
+_CLEAN_TABLE = str.maketrans(
+    {chr(c): None for c in range(128) if chr(c) not in _CLEAN_ALLOWED}
+)
+
+
+PROMPT_CONTEXT_CHAR_LIMIT = 4000
+_ABSTRACT_RE = re.compile(r"\\begin\{abstract\}(.*?)\\end\{abstract\}", re.DOTALL)
+_SECTION_RE = re.compile(r"\\section\*?\{[^}]*\}")
+_AGGREGATOR_KEYWORDS = ("def ", "plt.", "label=", "title=", "legend", "savefig")
+
+
+def _condense_writeup(latex, limit=PROMPT_CONTEXT_CHAR_LIMIT, section_chars=400):
+    """Keep the abstract and the opening of each section of a LaTeX writeup."""
+    if len(latex) <= limit:
+        return latex
+    parts = []
+    abstract = _ABSTRACT_RE.search(latex)
+    if abstract:
+        parts.append(
+            "\\begin{abstract}\n" + abstract.group(1).strip() + "\n\\end{abstract}"
+        )
+    headings = list(_SECTION_RE.finditer(latex))
+    for heading, next_heading in zip(headings, headings[1:] + [None]):
+        end = next_heading.start() if next_heading else len(latex)
+        body = latex[heading.end() : end].strip()
+        parts.append(heading.group(0) + "\n" + body[:section_chars])
+    return ("\n\n".join(parts) if parts else latex)[:limit]
+
+
+def _condense_aggregator(code, limit=PROMPT_CONTEXT_CHAR_LIMIT):
+    """Keep the plotting calls, titles and legend labels of an aggregator script."""
+    if len(code) <= limit:
+        return code
+    lines = [
+        line
+        for line in code.splitlines()
+        if any(keyword in line for keyword in _AGGREGATOR_KEYWORDS)
+    ]
+    return ("\n".join(lines) if lines else code)[:limit]
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _json_loads(data):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which json.dump writes for
+            # diverged metrics; let the stdlib parser decide
+            pass
+    return json.loads(data)
+
+
+def _json_dumps_indented(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+@functools.lru_cache(maxsize=64)
+def _read_text_cached(path, mtime_ns):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _read_text(path):
+    """Read a text file, reusing the cached contents while its mtime is unchanged."""
+    return _read_text_cached(path, os.stat(path).st_mtime_ns)
+
+
 def remove_accents_and_clean(s):
     """Clean a string for use as a LaTeX identifier."""
-    # Normalize to separate accents
-    nfkd_form = unicodedata.normalize("NFKD", s)
-    # Remove non-ASCII characters
-    ascii_str = nfkd_form.encode("ASCII", "ignore").decode("ascii")
-    # Remove anything but letters, digits, underscores, colons, dashes, @, {, }, and commas
-    ascii_str = re.sub(r"[^a-zA-Z0-9:_@\{\},-]+", "", ascii_str)
-    # Convert to lowercase
-    ascii_str = ascii_str.lower()
-    return ascii_str
+    if not s.isascii():
+        # Normalize to separate accents, then remove non-ASCII characters
+        nfkd_form = unicodedata.normalize("NFKD", s)
+        s = nfkd_form.encode("ASCII", "ignore").decode("ascii")
+    # Convert to lowercase and remove anything but letters, digits, underscores,
+    # colons, dashes, @, {, }, and commas in a single translate pass
+    return s.lower().translate(_CLEAN_TABLE)
+
+
+GA_CACHE_DIR = osp.expanduser("~/.cache/ai_scientist")
+GA_TIKZ_LIBRARIES = "arrows.meta,positioning,calc,fit,backgrounds,shapes.geometric"
+
+
+_GA_PREAMBLE = (
+    "\\RequirePackage{tikz}\n"
+    f"\\usetikzlibrary{{{GA_TIKZ_LIBRARIES}}}\n"
+    "\\dump\n"
+)
+
+
+def _pdflatex_version():
+    """Return ``pdflatex --version`` output, or None if pdflatex is unavailable."""
+    try:
+        return subprocess.run(
+            ["pdflatex", "--version"], capture_output=True, text=True, timeout=10
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _ga_preamble_format():
+    """Build (once) a pdflatex format with TikZ preloaded; return its path or None."""
+    version = _pdflatex_version()
+    if not version:
+        return None
+    # A format only loads in the pdflatex build that dumped it, so key it on
+    # the version as well as the preamble it was built from
+    tag = hashlib.sha256(f"{version}\0{_GA_PREAMBLE}".encode("utf-8")).hexdigest()[:16]
+    jobname = f"ga_preamble_{tag}"
+    fmt_base = osp.join(GA_CACHE_DIR, jobname)
+    if osp.exists(fmt_base + ".fmt"):
+        return fmt_base
+    os.makedirs(GA_CACHE_DIR, exist_ok=True)
+    # Build in a private directory and move the result into place, so a
+    # concurrent run never loads a half-written format
+    with tempfile.TemporaryDirectory(dir=GA_CACHE_DIR) as build_dir:
+        with open(osp.join(build_dir, jobname + ".tex"), "w") as f:
+            f.write(_GA_PREAMBLE)
+        try:
+            subprocess.run(
+                [
+                    "pdflatex",
+                    "-ini",
+                    f"-jobname={jobname}",
+                    "-interaction=nonstopmode",
+                    f"&pdflatex {jobname}.tex",
+                ],
+                cwd=build_dir,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=120,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            print("Warning: could not build the TikZ preamble format; using plain pdflatex.")
+            return None
+        built = osp.join(build_dir, jobname + ".fmt")
+        if not osp.exists(built):
+            return None
+        os.replace(built, fmt_base + ".fmt")
+    return fmt_base
+
+
+def _run_chktex(tex_file, timeout=10):
+    """Run chktex on a LaTeX file and return its report ("" if unavailable)."""
+    try:
+        return subprocess.run(
+            ["chktex", tex_file, "-q", "-n2", "-n24", "-n13", "-n1"],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        print("EXCEPTION running chktex:")
+        print(traceback.format_exc())
+        return ""
+
+
+_RERUN_MARKERS = ("Rerun to get", "Label(s) may have changed")
+_CROSS_REF_RE = re.compile(r"\\(?:ref|pageref|label)\{|remember picture")
+
+
+def _uses_cross_references(tex_file):
+    """Return True if the TikZ source needs an extra pass to resolve positions."""
+    try:
+        with open(tex_file, "r") as f:
+            return _CROSS_REF_RE.search(f.read()) is not None
+    except FileNotFoundError:
+        return False
+
+
+def _log_requests_rerun(output_dir):
+    """Check the pdflatex log for the markers asking for another pass."""
+    log_path = osp.join(output_dir, "graphical_abstract.log")
+    if not osp.exists(log_path):
+        return False
+    with open(log_path, "r", errors="replace") as f:
+        log = f.read()
+    return any(marker in log for marker in _RERUN_MARKERS)
+
+
+def _run_pdflatex(command, cwd, timeout):
+    """Run one pdflatex pass, streaming its output; return the exit code."""
+    try:
+        proc = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+    except OSError:
+        print(
+            f"EXCEPTION in compile_tikz_standalone: Error running command {' '.join(command)}"
+        )
+        print(traceback.format_exc())
+        return None
+
+    # Reading stdout blocks until pdflatex exits, so enforce the timeout by
+    # killing the process from a timer rather than in wait()
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            print(line, end="")
+        proc.wait()
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+
+    if timed_out.is_set():
+        print(
+            f"EXCEPTION in compile_tikz_standalone: LaTeX timed out after {timeout} seconds."
+        )
+        return None
+    return proc.returncode
+
+
+def _place_file(src, dst):
+    """Atomically move ``src`` to ``dst``, staging next to ``dst`` across filesystems."""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # The aux directory is usually on tmpfs: copy to a temporary name on the
+        # destination filesystem first so the final step is still a rename
+        tmp_dst = dst + ".tmp"
+        shutil.copyfile(src, tmp_dst)
+        os.replace(tmp_dst, dst)
+        os.remove(src)
 
 
 def compile_tikz_standalone(cwd, pdf_file, timeout=30):
     """Compile a standalone TikZ LaTeX document to PDF."""
     print("GENERATING GRAPHICAL ABSTRACT")
 
+    # Keep the transient .aux/.log/.pdf outputs on tmpfs when available so the
+    # compile passes don't pay for synchronous writes to the project disk
+    shm = "/dev/shm"
+    aux_dir = tempfile.mkdtemp(
+        prefix="graphical_abstract_", dir=shm if osp.isdir(shm) else None
+    )
+
     # For standalone TikZ documents, we only need pdflatex
-    commands = [
-        ["pdflatex", "-interaction=nonstopmode", "graphical_abstract.tex"],
-        ["pdflatex", "-interaction=nonstopmode", "graphical_abstract.tex"],  # Run twice for proper positioning
+    final_command = [
+        "pdflatex",
+        "-interaction=nonstopmode",
+        "-halt-on-error",
+        f"-output-directory={aux_dir}",
+        "graphical_abstract.tex",
     ]
+    # Start from a format with TikZ and its libraries already loaded, which
+    # removes most of the per-pass package loading time. Each pass still needs
+    # a fresh process: TeX ends the run at \end{document} and cannot load a
+    # second \documentclass, so one resident pdflatex can't serve several
+    # reflections.
+    fmt = _ga_preamble_format()
+    if fmt:
+        final_command.insert(1, f"-fmt={fmt}")
+    draft_command = final_command[:-1] + ["-draftmode", final_command[-1]]
+
+    try:
+        # Sources with cross-references need a position-resolving pass first; run
+        # it in draft mode to skip writing the PDF. Everything else almost always
+        # converges in one pass, so only rerun when the log asks for it. A
+        # failing first pass would fail again, so never follow it with another.
+        if _uses_cross_references(osp.join(cwd, "graphical_abstract.tex")):
+            if _run_pdflatex(draft_command, cwd, timeout) == 0:
+                _run_pdflatex(final_command, cwd, timeout)
+        else:
+            returncode = _run_pdflatex(final_command, cwd, timeout)
+            if returncode == 0 and _log_requests_rerun(aux_dir):
+                _run_pdflatex(final_command, cwd, timeout)
+
+        print("FINISHED GENERATING GRAPHICAL ABSTRACT")
 
-    for command in commands:
         try:
-            result = subprocess.run(
-                command,
-                cwd=cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=timeout,
-            )
-            print("Standard Output:\n", result.stdout)
-            print("Standard Error:\n", result.stderr)
-        except subprocess.TimeoutExpired:
-            print(
-                f"EXCEPTION in compile_tikz_standalone: LaTeX timed out after {timeout} seconds."
-            )
-            print(traceback.format_exc())
-        except subprocess.CalledProcessError:
-            print(
-                f"EXCEPTION in compile_tikz_standalone: Error running command {' '.join(command)}"
-            )
+            # Move the generated PDF to the target location
+            generated_pdf = osp.join(aux_dir, "graphical_abstract.pdf")
+            if osp.exists(generated_pdf):
+                _place_file(generated_pdf, pdf_file)
+            else:
+                print("Failed to find generated PDF.")
+        except FileNotFoundError:
+            print("Failed to rename PDF.")
+            print("EXCEPTION in compile_tikz_standalone while moving PDF:")
             print(traceback.format_exc())
+    finally:
+        shutil.rmtree(aux_dir, ignore_errors=True)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_llm_client(model):
+    """Create the LLM client for ``model`` once so batch runs reuse its connections."""
+    return create_client(model)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_vlm_client(model):
+    """Create the VLM client for ``model`` once so batch runs reuse its connections."""
+    return create_vlm_client(model)
+
+
+VLM_CACHE_PATH = osp.expanduser("~/.cache/ai_scientist/vlm_desc.sqlite")
+
+
+def _vlm_cache_connect():
+    os.makedirs(osp.dirname(VLM_CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(VLM_CACHE_PATH, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS vlm_desc (key TEXT PRIMARY KEY, desc TEXT)"
+    )
+    return conn
+
 
-    print("FINISHED GENERATING GRAPHICAL ABSTRACT")
+def _vlm_cache_key(ppath, vlm_model):
+    """Content-addressed cache key: sha256 of the image bytes plus the model id."""
+    with open(ppath, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest() + ":" + vlm_model
 
+
+def _vlm_cache_get(key):
     try:
-        # Move the generated PDF to the target location
-        generated_pdf = osp.join(cwd, "graphical_abstract.pdf")
-        if osp.exists(generated_pdf):
-            shutil.move(generated_pdf, pdf_file)
+        with contextlib.closing(_vlm_cache_connect()) as conn:
+            row = conn.execute(
+                "SELECT desc FROM vlm_desc WHERE key = ?", (key,)
+            ).fetchone()
+    except sqlite3.Error:
+        print(f"Warning: could not read VLM description cache at {VLM_CACHE_PATH}")
+        return None
+    return row[0] if row else None
+
+
+def _vlm_cache_put(key, val):
+    try:
+        with contextlib.closing(_vlm_cache_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO vlm_desc (key, desc) VALUES (?, ?)",
+                (key, val),
+            )
+    except sqlite3.Error:
+        print(f"Warning: could not write VLM description cache at {VLM_CACHE_PATH}")
+
+
+async def _describe_all(plot_names, figures_dir, vlm_model, vlm_client):
+    """Describe all plots concurrently with the VLM, keyed by filename."""
+    semaphore = asyncio.Semaphore(VLM_MAX_WORKERS)
+    by_key = {}
+
+    async def describe(pf):
+        ppath = osp.join(figures_dir, pf)
+        key = _vlm_cache_key(ppath, vlm_model)
+        # Plots with identical bytes (e.g. one per seed) share a single VLM call
+        if key not in by_key:
+            by_key[key] = asyncio.ensure_future(describe_image(key, ppath))
+        return await by_key[key]
+
+    async def describe_image(key, ppath):
+        cached = _vlm_cache_get(key)
+        if cached is not None:
+            return cached
+        img_dict = {
+            "images": [ppath],
+            "caption": "Figure for graphical abstract reference",
+        }
+        async with semaphore:
+            review_data = await asyncio.to_thread(
+                generate_vlm_img_review, img_dict, vlm_model, vlm_client
+            )
+        if not review_data or "Img_description" not in review_data:
+            return "No description found"
+        _vlm_cache_put(key, review_data["Img_description"])
+        return review_data["Img_description"]
+
+    tasks = [asyncio.create_task(describe(pf)) for pf in plot_names]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    desc_map = {}
+    for pf, desc in zip(plot_names, results):
+        if isinstance(desc, Exception):
+            print(f"EXCEPTION describing {pf}: {desc!r}")
+            desc_map[pf] = "No description found"
         else:
-            print("Failed to find generated PDF.")
-    except FileNotFoundError:
-        print("Failed to rename PDF.")
-        print("EXCEPTION in compile_tikz_standalone while moving PDF:")
-        print(traceback.format_exc())
+            desc_map[pf] = desc
+    return desc_map
 
 
 # System message template for graphical abstract generation
@@ -224,13 +580,11 @@ def perform_graph_abstract(
         idea_text = ""
         research_idea_path = osp.join(base_folder, "research_idea.md")
         if osp.exists(research_idea_path):
-            with open(research_idea_path, "r") as f_idea:
-                idea_text = f_idea.read()
+            idea_text = _read_text(research_idea_path)
         else:
             idea_md_path = osp.join(base_folder, "idea.md")
             if osp.exists(idea_md_path):
-                with open(idea_md_path, "r") as f_idea:
-                    idea_text = f_idea.read()
+                idea_text = _read_text(idea_md_path)
 
         # Load summaries
         summary_files = [
@@ -243,8 +597,8 @@ def perform_graph_abstract(
             path = osp.join(base_folder, fname)
             if osp.exists(path):
                 try:
-                    with open(path, "r") as f:
-                        loaded_summaries[key] = json.load(f)
+                    with open(path, "rb") as f:
+                        loaded_summaries[key] = _json_loads(f.read())
                 except json.JSONDecodeError:
                     print(
                         f"Warning: {fname} is not valid JSON. Using empty data for {key}."
@@ -254,7 +608,7 @@ def perform_graph_abstract(
                 loaded_summaries[key] = {}
 
         # Convert to JSON string for context
-        combined_summaries_str = json.dumps(loaded_summaries, indent=2)
+        combined_summaries_str = _json_dumps_indented(loaded_summaries)
 
         # Load existing LaTeX writeup if available
         latex_writeup = ""
@@ -262,23 +616,25 @@ def perform_graph_abstract(
         if osp.exists(latex_folder):
             writeup_file = osp.join(latex_folder, "template.tex")
             if osp.exists(writeup_file):
-                with open(writeup_file, "r") as f:
-                    latex_writeup = f.read()
+                latex_writeup = _read_text(writeup_file)
         
         # Gather plot filenames from figures/ folder
         figures_dir = osp.join(base_folder, "figures")
         plot_names = []
         if osp.exists(figures_dir):
-            for fplot in os.listdir(figures_dir):
-                if fplot.lower().endswith(".png"):
-                    plot_names.append(fplot)
+            with os.scandir(figures_dir) as it:
+                plot_names = [
+                    e.name
+                    for e in it
+                    if e.is_file(follow_symlinks=False)
+                    and e.name.lower().endswith(".png")
+                ]
 
         # Load aggregator script
         aggregator_path = osp.join(base_folder, "auto_plot_aggregator.py")
         aggregator_code = ""
         if osp.exists(aggregator_path):
-            with open(aggregator_path, "r") as fa:
-                aggregator_code = fa.read()
+            aggregator_code = _read_text(aggregator_path)
         else:
             aggregator_code = "No aggregator script found."
 
@@ -294,23 +650,10 @@ def perform_graph_abstract(
 
         # Generate VLM-based descriptions
         try:
-            vlm_client, vlm_model = create_vlm_client(model)
-            desc_map = {}
-            for pf in plot_names:
-                ppath = osp.join(figures_dir, pf)
-                if not osp.exists(ppath):
-                    continue
-                img_dict = {
-                    "images": [ppath],
-                    "caption": "Figure for graphical abstract reference",
-                }
-                review_data = generate_vlm_img_review(img_dict, vlm_model, vlm_client)
-                if review_data:
-                    desc_map[pf] = review_data.get(
-                        "Img_description", "No description found"
-                    )
-                else:
-                    desc_map[pf] = "No description found"
+            vlm_client, vlm_model = _cached_vlm_client(model)
+            desc_map = asyncio.run(
+                _describe_all(plot_names, figures_dir, vlm_model, vlm_client)
+            )
 
             # Prepare descriptions string
             plot_descriptions_list = []
@@ -324,14 +667,14 @@ def perform_graph_abstract(
             plot_descriptions_str = "No descriptions available."
 
         # Generate graphical abstract with big model
-        big_client, big_client_model = create_client(big_model)
+        big_client, big_client_model = _cached_llm_client(big_model)
         
         combined_prompt = graphical_abstract_prompt.format(
             idea_text=idea_text,
             summaries=combined_summaries_str,
-            aggregator_code=aggregator_code,
+            aggregator_code=_condense_aggregator(aggregator_code),
             plot_list=", ".join(plot_names),
-            latex_writeup=latex_writeup,
+            latex_writeup=_condense_writeup(latex_writeup),
             plot_descriptions=plot_descriptions_str,
         )
 
@@ -344,7 +687,7 @@ def perform_graph_abstract(
         )
 
         # Extract LaTeX code from response
-        latex_code_match = re.search(r"```latex(.*?)```", response, re.DOTALL)
+        latex_code_match = _LATEX_BLOCK_RE.search(response)
         if not latex_code_match:
             print("Failed to extract LaTeX code from LLM response")
             return False
@@ -357,21 +700,36 @@ def perform_graph_abstract(
             f.write(ga_latex_code)
 
         # Reflection loop for improvements
-        for i in range(n_reflections):
-            print(f"Performing reflection {i+1}/{n_reflections}")
-            
-            # Compile current version
-            compile_tikz_standalone(ga_folder, base_pdf_file + f"_{compile_attempt}.pdf")
-            compile_attempt += 1
-            
-            # Check for LaTeX syntax issues
-            with open(ga_file, "r") as f:
-                current_latex = f.read()
-            
-            # Simple syntax check
-            check_output = os.popen(f"chktex {ga_file} -q -n2 -n24 -n13 -n1").read()
-            
-            reflection_prompt = f"""
+        compiled_source_hash = None
+        compiled_pdf_file = None
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            for i in range(n_reflections):
+                print(f"Performing reflection {i+1}/{n_reflections}")
+                
+                # Stop once a reflection leaves the source unchanged; compiling and
+                # reflecting on it again would only repeat the previous round
+                with open(ga_file, "r") as f:
+                    current_latex = f.read()
+                source_hash = _digest(current_latex.encode())
+                if source_hash == compiled_source_hash:
+                    print("Graphical abstract unchanged since last reflection. Exiting reflection loop.")
+                    break
+                
+                # Compile current version in the background while chktex runs
+                # and the next reflection is requested; the reflection only
+                # depends on the source and the chktex report
+                pdf_file = base_pdf_file + f"_{compile_attempt}.pdf"
+                compile_fut = executor.submit(
+                    compile_tikz_standalone, ga_folder, pdf_file
+                )
+                compile_attempt += 1
+                compiled_source_hash = source_hash
+                compiled_pdf_file = pdf_file
+                
+                # Simple syntax check
+                check_output = _run_chktex(ga_file)
+                
+                reflection_prompt = f"""
 Let's reflect on the current graphical abstract and identify improvements:
 
 1) Are there any LaTeX syntax errors or compilation issues? Refer to chktex output below.
@@ -395,31 +753,39 @@ Please provide an improved version wrapped in triple backticks, or repeat the sa
 If you believe you are done, simply say: "I am done".
 """
 
-            reflection_response, msg_history = get_response_from_llm(
-                prompt=reflection_prompt,
-                client=big_client,
-                model=big_client_model,
-                system_message=graphical_abstract_system_message,
-                msg_history=msg_history,
-                print_debug=False,
-            )
-
-            if "I am done" in reflection_response:
-                print("LLM indicated it is done with reflections. Exiting reflection loop.")
-                break
-
-            reflection_code_match = re.search(
-                r"```latex(.*?)```", reflection_response, re.DOTALL
-            )
-            if reflection_code_match:
-                reflected_latex_code = reflection_code_match.group(1).strip()
-                with open(ga_file, "w") as f:
-                    f.write(reflected_latex_code)
-            else:
-                print("No LaTeX code found in reflection response, keeping current version")
-
-        # Final compilation
-        compile_tikz_standalone(ga_folder, base_pdf_file + f"_final.pdf")
+                reflection_response, msg_history = get_response_from_llm(
+                    prompt=reflection_prompt,
+                    client=big_client,
+                    model=big_client_model,
+                    system_message=graphical_abstract_system_message,
+                    msg_history=msg_history,
+                    print_debug=False,
+                )
+
+                # pdflatex reads the source lazily, so let the compile finish
+                # before the reflected version overwrites it
+                compile_fut.result()
+
+                if "I am done" in reflection_response:
+                    print("LLM indicated it is done with reflections. Exiting reflection loop.")
+                    break
+
+                reflection_code_match = _LATEX_BLOCK_RE.search(reflection_response)
+                if reflection_code_match:
+                    reflected_latex_code = reflection_code_match.group(1).strip()
+                    with open(ga_file, "w") as f:
+                        f.write(reflected_latex_code)
+                else:
+                    print("No LaTeX code found in reflection response, keeping current version")
+
+        # Final compilation, reusing the last reflection's PDF if the source
+        # has not changed since it was compiled
+        with open(ga_file, "r") as f:
+            final_hash = _digest(f.read().encode())
+        if final_hash == compiled_source_hash and osp.exists(compiled_pdf_file):
+            shutil.copyfile(compiled_pdf_file, base_pdf_file + f"_final.pdf")
+        else:
+            compile_tikz_standalone(ga_folder, base_pdf_file + f"_final.pdf")
         
         return osp.exists(base_pdf_file + f"_final.pdf")
 
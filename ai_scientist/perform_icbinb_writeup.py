@@ -1,4 +1,5 @@
 import argparse
+import functools
 import json
 import os
 import os.path as osp
@@ -10,6 +11,11 @@ import unicodedata
 import uuid
 import tempfile
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ai_scientist.llm import (
     get_response_from_llm,
     extract_json_between_markers,
@@ -22,6 +28,8 @@ from ai_scientist.utils.token_tracker import track_token_usage
 from ai_scientist.tools.semantic_scholar import search_for_papers
 
 from ai_scientist.perform_vlm_review import (
+    VLM_MAX_WORKERS,
+    describe_figures,
     generate_vlm_img_review,
     perform_imgs_cap_ref_review,
     perform_imgs_cap_ref_review_selection,
@@ -30,6 +38,13 @@ from ai_scientist.perform_vlm_review import (
 from ai_scientist.vlm import create_client as create_vlm_client
 
 
+def _summaries_to_json(summaries):
+    """Serialize filtered experiment summaries for a prompt, indented by 2."""
+    if orjson is not None:
+        return orjson.dumps(summaries, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(summaries, indent=2)
+
+
 def remove_accents_and_clean(s):
     # Normalize to separate accents
     nfkd_form = unicodedata.normalize("NFKD", s)
@@ -662,42 +677,68 @@ def load_idea_text(base_folder):
     return idea_text
 
 
+@functools.lru_cache(maxsize=64)
+def _load_summary_file(path, mtime_ns):
+    """
+    Parse one summary file. Keyed on mtime so an edited file is re-read;
+    callers treat the result as read-only.
+    """
+    with open(path, "rb") as f:
+        head = f.read(16)
+        # Failed stages write a bare null; skip the decoder for them
+        if head.strip() == b"null":
+            return None
+        data = head + f.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which json.dump writes for
+            # diverged metrics; let the stdlib parser decide
+            pass
+    return json.loads(data)
+
+
 def load_exp_summaries(base_folder):
     """
     Load the experiment summaries from the base folder.
     """
-    summary_files = [
-        ("logs/0-run/baseline_summary.json", "BASELINE_SUMMARY"),
-        ("logs/0-run/research_summary.json", "RESEARCH_SUMMARY"),
-        ("logs/0-run/ablation_summary.json", "ABLATION_SUMMARY"),
-    ]
-    loaded_summaries = {}
-    for fname, key in summary_files:
-        path = osp.join(base_folder, fname)
-        if osp.exists(path):
-            try:
-                with open(path, "r") as f:
-                    loaded_summaries[key] = json.load(f)
-            except json.JSONDecodeError:
-                print(
-                    f"Warning: {fname} is not valid JSON. Using empty data for {key}."
-                )
-                loaded_summaries[key] = {}
-        else:
+    summary_files = {
+        "baseline_summary.json": "BASELINE_SUMMARY",
+        "research_summary.json": "RESEARCH_SUMMARY",
+        "ablation_summary.json": "ABLATION_SUMMARY",
+    }
+    # Missing files load as empty data; keys keep their usual order
+    loaded_summaries = {key: {} for key in summary_files.values()}
+    try:
+        # One directory read instead of an exists() + stat() per file
+        with os.scandir(osp.join(base_folder, "logs", "0-run")) as it:
+            entries = [
+                entry for entry in it if entry.name in summary_files and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return loaded_summaries
+    for entry in entries:
+        key = summary_files[entry.name]
+        try:
+            loaded_summaries[key] = _load_summary_file(
+                entry.path, entry.stat().st_mtime_ns
+            )
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            print(
+                f"Warning: logs/0-run/{entry.name} is not valid JSON. Using empty data for {key}."
+            )
             loaded_summaries[key] = {}
     return loaded_summaries
 
 
-def filter_experiment_summaries(exp_summaries, step_name):
-    if step_name == "citation_gathering":
-        node_keys_to_keep = {
-            "overall_plan",
-            "analysis",
-            "metric",
-            "vlm_feedback_summary",
-        }
-    elif step_name == "writeup":
-        node_keys_to_keep = {
+# Node keys kept from each summary, per writeup step
+_STEP_NODE_KEYS = {
+    "citation_gathering": frozenset(
+        {"overall_plan", "analysis", "metric", "vlm_feedback_summary"}
+    ),
+    "writeup": frozenset(
+        {
             "overall_plan",
             "analysis",
             "metric",
@@ -705,8 +746,9 @@ def filter_experiment_summaries(exp_summaries, step_name):
             "plot_analyses",
             "vlm_feedback_summary",
         }
-    elif step_name == "plot_aggregation":
-        node_keys_to_keep = {
+    ),
+    "plot_aggregation": frozenset(
+        {
             "overall_plan",
             "analysis",
             "plot_plan",
@@ -715,38 +757,45 @@ def filter_experiment_summaries(exp_summaries, step_name):
             "vlm_feedback_summary",
             "exp_results_npy_files",
         }
-    else:
-        raise ValueError(f"Invalid step name: {step_name}")
+    ),
+}
+
+
+def filter_experiment_summaries(exp_summaries, step_name):
+    try:
+        node_keys_to_keep = _STEP_NODE_KEYS[step_name]
+    except KeyError:
+        raise ValueError(f"Invalid step name: {step_name}") from None
 
     filtered_summaries = {}
-    for stage_name in exp_summaries.keys():
+    for stage_name, stage_summary in exp_summaries.items():
         if stage_name in {"BASELINE_SUMMARY", "RESEARCH_SUMMARY"}:
             # Skip if the stage summary is None (failed experiments)
-            if exp_summaries[stage_name] is None:
+            if stage_summary is None:
                 filtered_summaries[stage_name] = None
                 continue
-            filtered_summaries[stage_name] = {}
-            for key in exp_summaries[stage_name].keys():
-                if key in {"best node"}:
-                    filtered_summaries[stage_name][key] = {}
-                    for node_key in exp_summaries[stage_name][key].keys():
-                        if node_key in node_keys_to_keep:
-                            filtered_summaries[stage_name][key][node_key] = (
-                                exp_summaries[stage_name][key][node_key]
-                            )
+            filtered_summaries[stage_name] = {
+                key: {
+                    node_key: value
+                    for node_key, value in stage_summary[key].items()
+                    if node_key in node_keys_to_keep
+                }
+                for key in stage_summary
+                if key == "best node"
+            }
         elif stage_name == "ABLATION_SUMMARY" and step_name == "plot_aggregation":
             # Skip if the stage summary is None (failed experiments)
-            if exp_summaries[stage_name] is None:
+            if stage_summary is None:
                 filtered_summaries[stage_name] = None
                 continue
-            filtered_summaries[stage_name] = {}
-            for ablation_summary in exp_summaries[stage_name]:
-                filtered_summaries[stage_name][ablation_summary["ablation_name"]] = {}
-                for node_key in ablation_summary.keys():
-                    if node_key in node_keys_to_keep:
-                        filtered_summaries[stage_name][
-                            ablation_summary["ablation_name"]
-                        ][node_key] = ablation_summary[node_key]
+            filtered_summaries[stage_name] = {
+                ablation_summary["ablation_name"]: {
+                    node_key: value
+                    for node_key, value in ablation_summary.items()
+                    if node_key in node_keys_to_keep
+                }
+                for ablation_summary in stage_summary
+            }
     return filtered_summaries
 
 
@@ -793,11 +842,14 @@ def gather_citations(base_folder, num_cite_rounds=20, small_model="gpt-4o-2024-0
         filtered_summaries = filter_experiment_summaries(
             exp_summaries, step_name="citation_gathering"
         )
-        filtered_summaries_str = json.dumps(filtered_summaries, indent=2)
+        filtered_summaries_str = _summaries_to_json(filtered_summaries)
 
         # Run small model for citation additions
         client, client_model = create_client(small_model)
 
+        # Rounds cannot be batched: each prompt includes the citations added
+        # so far, and the second call of a round depends on the search results
+        # for the query chosen by the first.
         for round_idx in range(current_round, num_cite_rounds):
             try:
                 context_for_citation = (filtered_summaries_str, citations_text)
@@ -871,6 +923,7 @@ def perform_writeup(
     big_model="o1-2024-12-17",
     n_writeup_reflections=3,
     page_limit=4,
+    vlm_max_workers=VLM_MAX_WORKERS,
 ):
     pdf_file = osp.join(base_folder, f"{osp.basename(base_folder)}.pdf")
     latex_folder = osp.join(base_folder, "latex")
@@ -893,7 +946,7 @@ def perform_writeup(
             exp_summaries, step_name="writeup"
         )
         # Convert them to one big JSON string for context
-        combined_summaries_str = json.dumps(filtered_summaries_for_writeup, indent=2)
+        combined_summaries_str = _summaries_to_json(filtered_summaries_for_writeup)
 
         # Prepare a new fresh latex folder
         if not osp.exists(osp.join(latex_folder, "template.tex")):
@@ -959,22 +1012,22 @@ def perform_writeup(
         # Generate VLM-based descriptions
         try:
             vlm_client, vlm_model = create_vlm_client("gpt-4o-2024-05-13")
-            desc_map = {}
-            for pf in plot_names:
-                ppath = osp.join(figures_dir, pf)
-                if not osp.exists(ppath):
-                    continue
-                img_dict = {
-                    "images": [ppath],
-                    "caption": "No direct caption",
-                }
-                review_data = generate_vlm_img_review(img_dict, vlm_model, vlm_client)
-                if review_data:
-                    desc_map[pf] = review_data.get(
-                        "Img_description", "No description found"
-                    )
-                else:
-                    desc_map[pf] = "No description found"
+            # Each description is an independent VLM round-trip, so run them concurrently
+            plot_paths = {
+                osp.join(figures_dir, pf): pf
+                for pf in plot_names
+                if osp.exists(osp.join(figures_dir, pf))
+            }
+            descriptions = describe_figures(
+                plot_paths,
+                lambda ppath: generate_vlm_img_review(
+                    {"images": [ppath], "caption": "No direct caption"},
+                    vlm_model,
+                    vlm_client,
+                ),
+                max_workers=vlm_max_workers,
+            )
+            desc_map = {plot_paths[ppath]: desc for ppath, desc in descriptions.items()}
 
             plot_descriptions_list = []
             for fname in plot_names:
@@ -259,20 +259,17 @@ def load_paper(pdf_path, num_pages=None, min_size=100):
         if num_pages is None:
             text = pymupdf4llm.to_markdown(pdf_path)
         else:
-            reader = PdfReader(pdf_path)
-            min_pages = min(len(reader.pages), num_pages)
+            with pymupdf.open(pdf_path) as doc:
+                min_pages = min(doc.page_count, num_pages)
             text = pymupdf4llm.to_markdown(pdf_path, pages=list(range(min_pages)))
         if len(text) < min_size:
             raise Exception("Text too short")
     except Exception as e:
         print(f"Error with pymupdf4llm, falling back to pymupdf: {e}")
         try:
-            doc = pymupdf.open(pdf_path)
-            if num_pages:
-                doc = doc[:num_pages]
-            text = ""
-            for page in doc:
-                text += page.get_text()
+            with pymupdf.open(pdf_path) as doc:
+                pages = doc.pages(0, num_pages) if num_pages else doc.pages()
+                text = "".join(page.get_text() for page in pages)
             if len(text) < min_size:
                 raise Exception("Text too short")
         except Exception as e:
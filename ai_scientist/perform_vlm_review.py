@@ -3,6 +3,8 @@ import hashlib
 import pymupdf
 import re
 import base64
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from ai_scientist.vlm import (
     get_response_from_vlm,
     get_batch_responses_from_vlm,
@@ -369,6 +371,33 @@ def generate_vlm_img_review(img, model, client):
     return img_review_json
 
 
+# Upper bound on concurrent VLM requests when describing a batch of figures
+VLM_MAX_WORKERS = 8
+
+
+def describe_figures(figure_paths, review_fn, max_workers=VLM_MAX_WORKERS):
+    """Describe figures concurrently; returns {path: Img_description}.
+
+    ``review_fn(path)`` returns a review dict. A figure whose review fails is
+    logged and gets "No description found" without affecting the others.
+    """
+    descriptions = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(review_fn, path): path for path in figure_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                review_data = future.result()
+            except Exception:
+                print(f"EXCEPTION in VLM description for {os.path.basename(path)}:")
+                print(traceback.format_exc())
+                review_data = None
+            descriptions[path] = (review_data or {}).get(
+                "Img_description", "No description found"
+            )
+    return descriptions
+
+
 def perform_imgs_cap_ref_review(client, client_model, pdf_path):
     paper_txt = load_paper(pdf_path)
     img_folder_path = os.path.join(
@@ -1,14 +1,22 @@
 import argparse
+import functools
+import hashlib
 import json
 import os
 import os.path as osp
 import re
 import shutil
+import string
 import subprocess
 import traceback
 import unicodedata
 import uuid
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ai_scientist.llm import (
     get_response_from_llm,
     extract_json_between_markers,
@@ -18,35 +26,173 @@ from ai_scientist.llm import (
 
 from ai_scientist.tools.semantic_scholar import search_for_papers
 
-from ai_scientist.perform_vlm_review import generate_vlm_img_review
+from ai_scientist.perform_vlm_review import describe_figures, generate_vlm_img_review
 from ai_scientist.vlm import create_client as create_vlm_client
 
+# Send the experiment summaries to the LLM as compact JSON; the indentation only
+# adds prompt tokens. Set to False to restore the pretty-printed form.
+COMPACT_SUMMARY_JSON = True
+
+_CLEAN_KEEP = frozenset(string.ascii_letters + string.digits + ":_@{},-")
+_CLEAN_TABLE = {c: None for c in range(256) if chr(c) not in _CLEAN_KEEP}
+
+
+def _summaries_to_json(summaries):
+    """Serialize the experiment summaries for the prompt (compact unless disabled)."""
+    if orjson is not None:
+        option = 0 if COMPACT_SUMMARY_JSON else orjson.OPT_INDENT_2
+        return orjson.dumps(summaries, option=option).decode()
+    if COMPACT_SUMMARY_JSON:
+        return json.dumps(summaries, separators=(",", ":"))
+    return json.dumps(summaries, indent=2)
+
+
+def _json_loads(data):
+    """Parse JSON bytes with orjson when available, falling back to the stdlib."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity, which json.dump writes for
+            # diverged metrics; let the stdlib parser decide
+            pass
+    return json.loads(data)
+
+
+def _load_summaries_str(base_folder):
+    """
+    Load the experiment summaries and return them as a single JSON string.
+    Only the string is returned, so the parsed trees are freed immediately
+    instead of staying alive for the rest of the writeup.
+    """
+    summary_files = [
+        ("logs/0-run/baseline_summary.json", "BASELINE_SUMMARY"),
+        ("logs/0-run/research_summary.json", "RESEARCH_SUMMARY"),
+        ("logs/0-run/ablation_summary.json", "ABLATION_SUMMARY"),
+    ]
+    loaded_summaries = {}
+    for fname, key in summary_files:
+        path = osp.join(base_folder, fname)
+        if osp.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                loaded_summaries[key] = _json_loads(data)
+            except json.JSONDecodeError:
+                print(
+                    f"Warning: {fname} is not valid JSON. Using empty data for {key}."
+                )
+                loaded_summaries[key] = {}
+        else:
+            loaded_summaries[key] = {}
+    return _summaries_to_json(loaded_summaries)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_llm_client(model):
+    """Create the LLM client for ``model`` once and reuse it across writeups."""
+    return create_client(model)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_vlm_client(model):
+    """Create the VLM client for ``model`` once and reuse it across writeups."""
+    return create_vlm_client(model)
+
 
 def remove_accents_and_clean(s):
     # print("Original:", s)
-    # Normalize to separate accents
-    nfkd_form = unicodedata.normalize("NFKD", s)
-    # Remove non-ASCII characters
-    ascii_str = nfkd_form.encode("ASCII", "ignore").decode("ascii")
+    if s.isascii():
+        ascii_str = s
+    else:
+        # Normalize to separate accents
+        nfkd_form = unicodedata.normalize("NFKD", s)
+        # Remove non-ASCII characters
+        ascii_str = nfkd_form.encode("ASCII", "ignore").decode("ascii")
     # Remove anything but letters, digits, underscores, colons, dashes, @, {, }, and now commas
-    ascii_str = re.sub(r"[^a-zA-Z0-9:_@\{\},-]+", "", ascii_str)
+    ascii_str = ascii_str.translate(_CLEAN_TABLE)
     # Convert to lowercase
     ascii_str = ascii_str.lower()
     # print("Cleaned: ", ascii_str)
     return ascii_str
 
 
+def _cached_vlm_img_review(ppath, cache_dir, vlm_model, vlm_client):
+    """Review a figure with the VLM, reusing the stored review if the image is unchanged."""
+    with open(ppath, "rb") as f:
+        digest = hashlib.blake2b(f.read() + vlm_model.encode()).hexdigest()
+    cache_path = osp.join(cache_dir, digest + ".json")
+    if osp.exists(cache_path):
+        try:
+            with open(cache_path, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            pass
+    review_data = generate_vlm_img_review(
+        {"images": [ppath], "caption": "No direct caption"}, vlm_model, vlm_client
+    )
+    if review_data:
+        with open(cache_path, "w") as f:
+            json.dump(review_data, f)
+    return review_data
+
+
+# Skip the second draft pass once references have converged; set to False to
+# always run the full pdflatex, bibtex, pdflatex, pdflatex sequence
+LATEX_EARLY_STOP = True
+
+
+def _file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read()).digest()
+    except FileNotFoundError:
+        return None
+
+
+def _latex_commands(cwd, interaction):
+    """
+    Yield the pdflatex/bibtex passes for template.tex in cwd. Only the last
+    pdflatex pass writes the PDF; the earlier ones run in draft mode and just
+    settle the .aux/.bbl. This is a generator so the convergence check sees the
+    results of the passes the caller has already run.
+    """
+    draft = ["pdflatex", f"-interaction={interaction}", "-draftmode", "template.tex"]
+    aux_path = osp.join(cwd, "template.aux")
+    bbl_path = osp.join(cwd, "template.bbl")
+    aux_before = _file_digest(aux_path)
+    bbl_before = _file_digest(bbl_path)
+
+    yield draft
+    yield ["bibtex", "template"]
+    # If the first pass rewrote an identical .aux (left by the previous compile)
+    # and bibtex produced an identical .bbl, the final pass already sees
+    # resolved references and the second draft pass would change nothing
+    converged = (
+        LATEX_EARLY_STOP
+        and aux_before is not None
+        and _file_digest(aux_path) == aux_before
+        and _file_digest(bbl_path) == bbl_before
+        and not _log_requests_rerun(cwd)
+    )
+    if not converged:
+        yield draft
+    yield ["pdflatex", f"-interaction={interaction}", "template.tex"]
+
+
+def _log_requests_rerun(cwd):
+    try:
+        with open(osp.join(cwd, "template.log"), "r", errors="ignore") as f:
+            log = f.read()
+    except FileNotFoundError:
+        return True
+    return "Rerun to get" in log or "Label(s) may have changed" in log
+
+
 def compile_latex(cwd, pdf_file, timeout=30):
     print("GENERATING LATEX")
 
-    commands = [
-        ["pdflatex", "-interaction=nonstopmode", "template.tex"],
-        ["bibtex", "template"],
-        ["pdflatex", "-interaction=nonstopmode", "template.tex"],
-        ["pdflatex", "-interaction=nonstopmode", "template.tex"],
-    ]
-
-    for command in commands:
+    for command in _latex_commands(cwd, "nonstopmode"):
         try:
             result = subprocess.run(
                 command,
@@ -79,31 +225,89 @@ def compile_latex(cwd, pdf_file, timeout=30):
         print(traceback.format_exc())
 
 
+# Files pdflatex/bibtex write next to the main .tex
+_LATEX_GENERATED_EXTENSIONS = (".aux", ".bbl", ".blg", ".log", ".out", ".pdf", ".toc")
+# Files a compile only reads; everything else is copied into a staging dir
+_LATEX_INPUT_EXTENSIONS = (
+    ".tex", ".bib", ".sty", ".cls", ".bst",
+    ".png", ".jpg", ".jpeg", ".pdf", ".eps", ".svg",
+)
+
+# Impact-probe results keyed by a digest of the LaTeX sources they were compiled from
+_IMPACT_CACHE = {}
+
+
+def _latex_sources_digest(latex_folder):
+    """Hash every file the compile can read: sources, \\input files and figures."""
+    h = hashlib.blake2b()
+    for root, dirs, files in os.walk(latex_folder):
+        # Skip in-flight probe copies; sort so the walk order is stable
+        dirs[:] = sorted(d for d in dirs if not d.startswith("_temp_compile_"))
+        for name in sorted(files):
+            # Top-level compiler outputs are regenerated by the compile itself;
+            # files below it (e.g. figures/*.pdf) are inputs
+            if root == latex_folder and name.endswith(_LATEX_GENERATED_EXTENSIONS):
+                continue
+            path = osp.join(root, name)
+            h.update(osp.relpath(path, latex_folder).encode() + b"\0")
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+
+def _link_or_copy(src, dst, latex_folder):
+    """Stage a file by hardlinking it if it is a known read-only input, else copy it."""
+    # A top-level .pdf is the compile's own output, not a figure
+    is_output = osp.dirname(src) == latex_folder and src.endswith(
+        _LATEX_GENERATED_EXTENSIONS
+    )
+    if src.endswith(_LATEX_INPUT_EXTENSIONS) and not is_output:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
 def detect_pages_before_impact(latex_folder, timeout=30):
     """
     Temporarily copy the latex folder, compile, and detect on which page
     the phrase "Impact Statement" appears.
     Returns a tuple (page_number, line_number) if found, otherwise None.
+    Results are cached per set of LaTeX sources, so probing an unchanged
+    writeup again does not recompile it.
     """
+    try:
+        key = _latex_sources_digest(latex_folder)
+    except OSError:
+        return None
+    if key not in _IMPACT_CACHE:
+        _IMPACT_CACHE[key] = _compile_and_find_impact(latex_folder, timeout)
+    return _IMPACT_CACHE[key]
+
+
+def _compile_and_find_impact(latex_folder, timeout):
+    # The copy also carries over the .aux/.bbl left by the last compile_latex
+    # run, so the probe's passes start from already-resolved references
     temp_dir = osp.join(latex_folder, f"_temp_compile_{uuid.uuid4().hex}")
     try:
-        shutil.copytree(latex_folder, temp_dir, dirs_exist_ok=True)
+        shutil.copytree(
+            latex_folder,
+            temp_dir,
+            dirs_exist_ok=True,
+            copy_function=functools.partial(_link_or_copy, latex_folder=latex_folder),
+        )
 
         # Compile in the temp folder
-        commands = [
-            ["pdflatex", "-interaction=nonstopmode", "template.tex"],
-            ["bibtex", "template"],
-            ["pdflatex", "-interaction=nonstopmode", "template.tex"],
-            ["pdflatex", "-interaction=nonstopmode", "template.tex"],
-        ]
-        for command in commands:
+        for command in _latex_commands(temp_dir, "batchmode"):
             try:
+                # Nothing inspects the probe's compiler output, so don't capture it
                 subprocess.run(
                     command,
                     cwd=temp_dir,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
                     timeout=timeout,
                 )
             except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
@@ -113,33 +317,26 @@ def detect_pages_before_impact(latex_folder, timeout=30):
         if not osp.exists(temp_pdf_file):
             return None
 
-        # Try page-by-page extraction to detect "Impact Statement"
-        for i in range(1, 51):
-            page_txt = osp.join(temp_dir, f"page_{i}.txt")
-            subprocess.run(
-                [
-                    "pdftotext",
-                    "-f",
-                    str(i),
-                    "-l",
-                    str(i),
-                    "-q",
-                    temp_pdf_file,
-                    page_txt,
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if not osp.exists(page_txt):
-                break
-            with open(page_txt, "r", encoding="utf-8", errors="ignore") as fp:
-                page_content = fp.read()
-            lines = page_content.split("\n")
-            for idx, line in enumerate(lines):
-                if "Impact Statement" in line:
-                    return (i, idx + 1)
-        return None
+        # Extract the whole document in one pass; pdftotext separates pages
+        # with form feeds, so page boundaries can be recovered from the text
+        result = subprocess.run(
+            ["pdftotext", "-q", temp_pdf_file, "-"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            errors="ignore",
+            timeout=timeout,
+        )
+        # Locate the phrase in the full text and derive its page and line by
+        # counting the form feeds and newlines that precede it
+        full = result.stdout
+        idx = full.find("Impact Statement")
+        if idx < 0:
+            return None
+        page_start = full.rfind("\f", 0, idx) + 1
+        page = full.count("\f", 0, idx) + 1
+        line = full.count("\n", page_start, idx) + 1
+        return (page, line)
     except Exception:
         return None
     finally:
@@ -484,29 +681,8 @@ def perform_writeup(
                 with open(idea_md_path, "r") as f_idea:
                     idea_text = f_idea.read()
 
-        # Load summaries
-        summary_files = [
-            ("logs/0-run/baseline_summary.json", "BASELINE_SUMMARY"),
-            ("logs/0-run/research_summary.json", "RESEARCH_SUMMARY"),
-            ("logs/0-run/ablation_summary.json", "ABLATION_SUMMARY"),
-        ]
-        loaded_summaries = {}
-        for fname, key in summary_files:
-            path = osp.join(base_folder, fname)
-            if osp.exists(path):
-                try:
-                    with open(path, "r") as f:
-                        loaded_summaries[key] = json.load(f)
-                except json.JSONDecodeError:
-                    print(
-                        f"Warning: {fname} is not valid JSON. Using empty data for {key}."
-                    )
-                    loaded_summaries[key] = {}
-            else:
-                loaded_summaries[key] = {}
-
-        # Convert them to one big JSON string for context
-        combined_summaries_str = json.dumps(loaded_summaries, indent=2)
+        # Load summaries and convert them to one big JSON string for context
+        combined_summaries_str = _load_summaries_str(base_folder)
 
         # Prepare a new fresh latex folder
         if not osp.exists(osp.join(latex_folder, "template.tex")):
@@ -522,9 +698,12 @@ def perform_writeup(
         figures_dir = osp.join(base_folder, "figures")
         plot_names = []
         if osp.exists(figures_dir):
-            for fplot in os.listdir(figures_dir):
-                if fplot.lower().endswith(".png"):
-                    plot_names.append(fplot)
+            with os.scandir(figures_dir) as it:
+                plot_names = [
+                    e.name
+                    for e in it
+                    if e.is_file() and e.name.lower().endswith(".png")
+                ]
 
         # Load aggregator script to include in the prompt
         aggregator_path = osp.join(base_folder, "auto_plot_aggregator.py")
@@ -540,10 +719,8 @@ def perform_writeup(
             return osp.exists(base_pdf_file + ".pdf")
 
         # Run small model for citation additions
-        client, client_model = create_client(small_model)
+        client, client_model = _cached_llm_client(small_model)
         for round_idx in range(num_cite_rounds):
-            with open(writeup_file, "r") as f:
-                writeup_text = f.read()
             try:
                 references_bib = re.search(
                     r"\\begin{filecontents}{references.bib}(.*?)\\end{filecontents}",
@@ -582,6 +759,9 @@ def perform_writeup(
                             )
                             with open(writeup_file, "w") as fo:
                                 fo.write(revised)
+                            # Keep the in-memory copy in sync so the file is only
+                            # read once
+                            writeup_text = revised
             except Exception:
                 print("EXCEPTION in perform_writeup (citation round):")
                 print(traceback.format_exc())
@@ -589,23 +769,24 @@ def perform_writeup(
 
         # Generate VLM-based descriptions but do not overwrite plot_names
         try:
-            vlm_client, vlm_model = create_vlm_client("gpt-4o-2024-05-13")
-            desc_map = {}
-            for pf in plot_names:
-                ppath = osp.join(figures_dir, pf)
-                if not osp.exists(ppath):
-                    continue
-                img_dict = {
-                    "images": [ppath],
-                    "caption": "No direct caption",
-                }
-                review_data = generate_vlm_img_review(img_dict, vlm_model, vlm_client)
-                if review_data:
-                    desc_map[pf] = review_data.get(
-                        "Img_description", "No description found"
-                    )
-                else:
-                    desc_map[pf] = "No description found"
+            vlm_client, vlm_model = _cached_vlm_client("gpt-4o-2024-05-13")
+            # Each description is an independent VLM round-trip, so run them concurrently
+            plot_paths = {
+                osp.join(figures_dir, pf): pf
+                for pf in plot_names
+                if osp.exists(osp.join(figures_dir, pf))
+            }
+            # Keep the cache out of figures/, which is listed and copied as plots
+            vlm_cache_dir = osp.join(base_folder, ".vlm_cache")
+            if plot_paths:
+                os.makedirs(vlm_cache_dir, exist_ok=True)
+            descriptions = describe_figures(
+                plot_paths,
+                lambda ppath: _cached_vlm_img_review(
+                    ppath, vlm_cache_dir, vlm_model, vlm_client
+                ),
+            )
+            desc_map = {plot_paths[ppath]: desc for ppath, desc in descriptions.items()}
 
             # Prepare a string listing all figure descriptions in order
             plot_descriptions_list = []
@@ -622,9 +803,7 @@ def perform_writeup(
         big_model_system_message = writeup_system_message_template.format(
             page_limit=page_limit
         )
-        big_client, big_client_model = create_client(big_model)
-        with open(writeup_file, "r") as f:
-            writeup_text = f.read()
+        big_client, big_client_model = _cached_llm_client(big_model)
 
         combined_prompt = writeup_prompt.format(
             idea_text=idea_text,
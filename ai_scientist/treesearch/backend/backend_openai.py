@@ -10,8 +10,8 @@ from rich import print
 
 logger = logging.getLogger("ai-scientist")
 
-_client: openai.OpenAI = None  # type: ignore
-_current_model: str = None  # track current model to recreate client if needed
+# one client per provider, so alternating models reuse their connection pools
+_clients: dict[str, openai.OpenAI] = {}
 
 OPENAI_TIMEOUT_EXCEPTIONS = (
     openai.RateLimitError,
@@ -21,13 +21,12 @@ OPENAI_TIMEOUT_EXCEPTIONS = (
 )
 
 
-def _setup_openai_client(model: str = None):
-    """Setup OpenAI client based on the model being used"""
-    global _client, _current_model
-    
-    # Only recreate client if model has changed or client doesn't exist
-    if _client is None or model != _current_model:
-        if model and ("deepseek" in model):
+def _setup_openai_client(model: str = None) -> openai.OpenAI:
+    """Return the (cached) OpenAI-compatible client for the model being used"""
+    base_url = "https://api.deepseek.com" if model and ("deepseek" in model) else None
+    key = base_url or "openai"
+    if key not in _clients:
+        if base_url:
             # Use DeepSeek API
             deepseek_api_key = os.environ.get("DEEPSEEK_API_KEY")
             if not deepseek_api_key:
@@ -35,18 +34,20 @@ def _setup_openai_client(model: str = None):
                     "DEEPSEEK_API_KEY environment variable is required for DeepSeek models. "
                     "Please set it with: export DEEPSEEK_API_KEY='your_api_key_here'"
                 )
-            _client = openai.OpenAI(
+            client = openai.OpenAI(
                 api_key=deepseek_api_key,
-                base_url="https://api.deepseek.com",
+                base_url=base_url,
                 max_retries=0
             )
             logger.info(f"Setup DeepSeek client for model: {model}")
         else:
             # Use default OpenAI API
-            _client = openai.OpenAI(max_retries=0)
+            client = openai.OpenAI(max_retries=0)
             logger.info(f"Setup OpenAI client for model: {model}")
-        
-        _current_model = model
+        # setdefault keeps a single client if two threads race on first use
+        _clients.setdefault(key, client)
+
+    return _clients[key]
 
 
 def query(
@@ -56,7 +57,9 @@ def query(
     **model_kwargs,
 ) -> tuple[OutputType, float, int, int, dict]:
     model = model_kwargs.get("model", "")
-    _setup_openai_client(model)
+    # Use a local client rather than module state so concurrent queries for
+    # different providers never swap endpoints under each other
+    client = _setup_openai_client(model)
     filtered_kwargs: dict = select_values(notnone, model_kwargs)  # type: ignore
 
     messages = opt_messages_to_list(system_message, user_message)
@@ -68,7 +71,7 @@ def query(
 
     t0 = time.time()
     completion = backoff_create(
-        _client.chat.completions.create,
+        client.chat.completions.create,
         OPENAI_TIMEOUT_EXCEPTIONS,
         messages=messages,
         **filtered_kwargs,
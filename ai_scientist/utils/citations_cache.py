@@ -0,0 +1,42 @@
+import json
+import os.path as osp
+
+from ai_scientist.perform_icbinb_writeup import gather_citations
+
+
+def cached_or_gather(experiment_dir, *, rounds, small_model):
+    """
+    Return the citations in cached_citations.bib when gathering already
+    finished, otherwise run (or resume) gather_citations.
+    """
+    citations_cache_path = osp.join(experiment_dir, "cached_citations.bib")
+    progress_path = osp.join(experiment_dir, "citations_progress.json")
+
+    try:
+        with open(citations_cache_path, "r") as f:
+            citations_text = f.read()
+    except OSError:
+        citations_text = ""
+
+    if citations_text.strip():
+        try:
+            with open(progress_path, "r") as f:
+                progress = json.load(f)
+        except FileNotFoundError:
+            # A bib without progress info was written by hand or by an older
+            # run; treat it as final.
+            progress = {"status": "completed"}
+        except (OSError, ValueError) as e:
+            print(f"Error loading citation progress: {e}")
+            progress = {}
+        if (
+            progress.get("status") == "completed"
+            or progress.get("completed_rounds", 0) >= rounds
+        ):
+            print(f"Using cached citations from {citations_cache_path}")
+            return citations_text
+
+    # gather_citations resumes from citations_progress.json on its own
+    return gather_citations(
+        experiment_dir, num_cite_rounds=rounds, small_model=small_model
+    )
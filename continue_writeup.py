@@ -14,12 +14,21 @@ from ai_scientist.llm import create_client
 from ai_scientist.perform_writeup import perform_writeup
 from ai_scientist.perform_icbinb_writeup import (
     perform_writeup as perform_icbinb_writeup,
-    gather_citations,
 )
 from ai_scientist.perform_llm_review import perform_review, load_paper
 from ai_scientist.perform_vlm_review import perform_imgs_cap_ref_review
+from ai_scientist.utils.citations_cache import cached_or_gather
 from ai_scientist.utils.token_tracker import token_tracker
 
+# Use OpenAI for VLM tasks
+VLM_MODEL = "gpt-4o-2024-05-13"
+
+# Writeup function and page limit for each --writeup-type
+WRITEUP_FNS = {
+    "normal": (perform_writeup, 8),
+    "icbinb": (perform_icbinb_writeup, 4),
+}
+
 
 def save_token_tracker(idea_dir):
     """Save token usage tracking data."""
@@ -29,26 +38,45 @@ def save_token_tracker(idea_dir):
         json.dump(token_tracker.get_interactions(), f)
 
 
+# One pass per filename: each match is either "final" (any case) or a lowercase
+# "reflection" with an optional reflection number.
+_PDF_CLASS_RE = re.compile(r"((?i:final))|(reflection)(?:[_.]?(\d+))?")
+
+
+def classify_pdf(name):
+    """Return (is_reflection, is_final, reflection_num) for a PDF filename."""
+    is_reflection = is_final = False
+    reflection_num = None
+    for final, reflection, digits in _PDF_CLASS_RE.findall(name):
+        if final:
+            is_final = True
+        elif reflection:
+            is_reflection = True
+            if digits and reflection_num is None:
+                reflection_num = int(digits)
+    return is_reflection, is_final, reflection_num
+
+
 def find_pdf_path_for_review(idea_dir):
     """Find the PDF file for review."""
-    pdf_files = [f for f in os.listdir(idea_dir) if f.endswith(".pdf")]
-    reflection_pdfs = [f for f in pdf_files if "reflection" in f]
+    with os.scandir(idea_dir) as it:
+        pdf_files = [e.name for e in it if e.name.endswith(".pdf") and e.is_file()]
+    classified = [(f, *classify_pdf(f)) for f in pdf_files]
+    reflection_pdfs = [c for c in classified if c[1]]
     
     pdf_path = None  # Initialize pdf_path
     
     if reflection_pdfs:
         # First check if there's a final version
-        final_pdfs = [f for f in reflection_pdfs if "final" in f.lower()]
+        final_pdfs = [f for f, _, is_final, _ in reflection_pdfs if is_final]
         if final_pdfs:
             # Use the final version if available
             pdf_path = osp.join(idea_dir, final_pdfs[0])
         else:
             # Try to find numbered reflections
-            reflection_nums = []
-            for f in reflection_pdfs:
-                match = re.search(r"reflection[_.]?(\d+)", f)
-                if match:
-                    reflection_nums.append((int(match.group(1)), f))
+            reflection_nums = [
+                (num, f) for f, _, _, num in reflection_pdfs if num is not None
+            ]
 
             if reflection_nums:
                 # Get the file with the highest reflection number
@@ -56,7 +84,7 @@ def find_pdf_path_for_review(idea_dir):
                 pdf_path = osp.join(idea_dir, highest_reflection[1])
             else:
                 # Fall back to the first reflection PDF if no numbers found
-                pdf_path = osp.join(idea_dir, reflection_pdfs[0])
+                pdf_path = osp.join(idea_dir, reflection_pdfs[0][0])
     else:
         # No reflection PDFs found, look for any PDF file
         if pdf_files:
@@ -78,7 +106,7 @@ def parse_arguments():
         "--writeup-type",
         type=str,
         default="icbinb",
-        choices=["normal", "icbinb"],
+        choices=list(WRITEUP_FNS),
         help="Type of writeup to generate (normal=8 page, icbinb=4 page)",
     )
     parser.add_argument(
@@ -157,9 +185,9 @@ def main():
         
         writeup_success = False
         print("📚 Gathering citations...")
-        citations_text = gather_citations(
+        citations_text = cached_or_gather(
             idea_dir,
-            num_cite_rounds=args.num_cite_rounds,
+            rounds=args.num_cite_rounds,
             small_model=args.model_citation,
         )
         
@@ -167,24 +195,16 @@ def main():
         print(f"🔗 Using citation model: {args.model_citation}")
         print(f"📄 Writeup type: {args.writeup_type}")
         
+        writeup_fn, page_limit = WRITEUP_FNS[args.writeup_type]
         for attempt in range(args.writeup_retries):
             print(f"\n📝 Writeup attempt {attempt+1} of {args.writeup_retries}")
-            if args.writeup_type == "normal":
-                writeup_success = perform_writeup(
-                    base_folder=idea_dir,
-                    big_model=args.model_writeup,
-                    small_model='gpt-4o-2024-05-13',  # Use OpenAI for VLM tasks
-                    page_limit=8,
-                    citations_text=citations_text,
-                )
-            else:
-                writeup_success = perform_icbinb_writeup(
-                    base_folder=idea_dir,
-                    big_model=args.model_writeup,
-                    small_model='gpt-4o-2024-05-13',  # Use OpenAI for VLM tasks
-                    page_limit=4,
-                    citations_text=citations_text,
-                )
+            writeup_success = writeup_fn(
+                base_folder=idea_dir,
+                big_model=args.model_writeup,
+                small_model=VLM_MODEL,
+                page_limit=page_limit,
+                citations_text=citations_text,
+            )
             if writeup_success:
                 print(f"✅ Writeup successful on attempt {attempt+1}")
                 break
@@ -275,19 +295,34 @@ def main():
         # Additional cleanup: find any orphaned processes containing specific keywords
         print("🔍 Checking for orphaned processes...")
         keywords = ["python", "torch", "mp", "bfts", "experiment"]
-        orphaned_count = 0
-        for proc in psutil.process_iter(["name", "cmdline"]):
+        keyword_re = re.compile("|".join(map(re.escape, keywords)))
+        # Never signal this script or the shell that launched it
+        own_pids = {os.getpid(), os.getppid()}
+        orphans = []
+        for proc in psutil.process_iter(["cmdline"]):
+            if proc.pid in own_pids:
+                continue
+            # cmdline is prefetched by process_iter; it is None when denied
+            cmdline = " ".join(proc.info["cmdline"] or ()).lower()
+            if keyword_re.search(cmdline):
+                orphans.append(proc)
+
+        # Signal every orphan first, then wait for all of them at once
+        signalled = []
+        for proc in orphans:
             try:
-                # Check both process name and command line arguments
-                cmdline = " ".join(proc.cmdline()).lower()
-                if any(keyword in cmdline for keyword in keywords):
-                    proc.send_signal(signal.SIGTERM)
-                    proc.wait(timeout=3)
-                    if proc.is_running():
-                        proc.kill()
-                    orphaned_count += 1
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired):
+                proc.send_signal(signal.SIGTERM)
+                signalled.append(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
+        orphaned_count = len(signalled)
+        if signalled:
+            gone, alive = psutil.wait_procs(signalled, timeout=3)
+            for proc in alive:
+                try:
+                    proc.kill()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
         
         if orphaned_count > 0:
             print(f"🧹 Cleaned up {orphaned_count} orphaned processes")
@@ -308,8 +343,9 @@ def main():
     if os.path.exists(osp.join(idea_dir, "template.pdf")):
         print("📄 PDF generated: template.pdf")
     if os.path.exists(osp.join(idea_dir, "figures")):
-        figures = os.listdir(osp.join(idea_dir, "figures"))
-        print(f"🖼️ Figures generated: {len(figures)} files")
+        with os.scandir(osp.join(idea_dir, "figures")) as it:
+            num_figures = sum(1 for e in it if e.is_file())
+        print(f"🖼️ Figures generated: {num_figures} files")
     if os.path.exists(osp.join(idea_dir, "review_text.txt")):
         print("🔍 Review completed: review_text.txt")
 
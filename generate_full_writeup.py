@@ -8,7 +8,153 @@ import os
 import sys
 import json
 import argparse
+import asyncio
+import importlib.util
+import math
+import mmap
+import re
+import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from ai_scientist.llm import get_response_from_llm, create_client
+from ai_scientist.llm_cache import PromptCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Files above this size are not inlined in full; JSON and CSV contribute only their head.
+MAX_TXT_SIZE = 1 << 20
+LOAD_MAX_WORKERS = 8
+
+def dumps_indented(obj):
+    """json.dumps(obj, indent=2), using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            # e.g. non-string keys, which orjson refuses but json coerces
+            pass
+    return json.dumps(obj, indent=2)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_LATEX_FENCE_RE = re.compile(r"```latex\s*(.*?)\s*```", re.DOTALL)
+_FENCE_MARKER_RE = re.compile(r"```\w*\n?")
+_LATEX_ENV_RE = re.compile(r"\\(?:begin|end)\{LaTeX\}\s*")
+
+class TfidfIndex:
+    """Minimal TF-IDF ranking over the entries of a dict (name -> JSON value)."""
+
+    def __init__(self, entries):
+        self.names = list(entries)
+        self.texts = [
+            value if isinstance(value, str) else dumps_indented(value)
+            for value in entries.values()
+        ]
+        docs = [
+            Counter(_TOKEN_RE.findall(f"{name} {text}".lower()))
+            for name, text in zip(self.names, self.texts)
+        ]
+        df = Counter(term for doc in docs for term in doc)
+        self.idf = {
+            term: math.log((1 + len(docs)) / (1 + count)) + 1
+            for term, count in df.items()
+        }
+        self.vectors = [self._normalize(doc) for doc in docs]
+
+    def _normalize(self, counts):
+        weights = {t: c * self.idf.get(t, 0.0) for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {t: w / norm for t, w in weights.items()}
+
+    def topk(self, query, k=5, max_chars=4000):
+        """Render the k entries most similar to ``query`` within ``max_chars``."""
+        q = self._normalize(Counter(_TOKEN_RE.findall(query.lower())))
+        scores = [
+            sum(w * vec.get(t, 0.0) for t, w in q.items()) for vec in self.vectors
+        ]
+        ranked = sorted(range(len(self.names)), key=lambda i: -scores[i])[:k]
+        parts, budget = [], max_chars
+        for i in ranked:
+            if budget <= 0:
+                break
+            part = f"[{self.names[i]}]\n{self.texts[i]}"[:budget]
+            parts.append(part)
+            budget -= len(part)
+        return "\n\n".join(parts)
+
+class ExperimentData:
+    """Experiment summaries and data files, selected per section."""
+
+    def __init__(self, summaries, data_files, k=5, max_chars=4000):
+        self.summaries = summaries
+        self.data_files = data_files
+        self.k = k
+        self.max_chars = max_chars
+        self.summary_index = TfidfIndex(summaries)
+        self.data_index = TfidfIndex(data_files)
+
+    def for_section(self, section_name, query):
+        # The experiments section reports results, so it gets the full dump.
+        if section_name == "experiments":
+            summaries = dumps_indented(self.summaries) if self.summaries else None
+            data_files = dumps_indented(self.data_files) if self.data_files else None
+        else:
+            summaries = self.summary_index.topk(query, self.k, self.max_chars) or None
+            data_files = self.data_index.topk(query, self.k, self.max_chars) or None
+        return f"""Experiment summaries: {summaries or 'No summaries available'}
+
+Data files: {data_files or 'No data files available'}"""
+
+def create_http_client():
+    """Keep-alive httpx pool shared by the section clients (HTTP/2 when h2 is installed)."""
+    try:
+        import httpx
+    except ImportError:
+        return None
+    return httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=8),
+    )
+
+def scan_files(directory, suffixes):
+    """Return DirEntry objects for regular files in ``directory`` ending with ``suffixes``."""
+    try:
+        with os.scandir(directory) as it:
+            return [e for e in it if e.name.endswith(suffixes) and e.is_file()]
+    except FileNotFoundError:
+        return []
+
+def list_files(directory, suffixes):
+    """Return names of regular files in ``directory`` ending with ``suffixes``."""
+    return [e.name for e in scan_files(directory, suffixes)]
+
+def read_text_head(path, size, limit=MAX_TXT_SIZE):
+    """Return at most ``limit`` bytes of a text file without reading the rest."""
+    if size == 0:
+        return ""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        head = m[:limit].decode("utf-8", errors="replace")
+    if size > limit:
+        # Cut at the last complete row and note what was dropped.
+        head = head[: head.rfind("\n") + 1] + f"<truncated, {size} bytes total>"
+    return head
+
+def read_data_entry(entry):
+    """Read one logs/ or data/ file for the prompt context."""
+    size = entry.stat().st_size
+    if entry.name.endswith('.json'):
+        if size > MAX_TXT_SIZE:
+            return read_text_head(entry.path, size)
+        with open(entry.path, "r") as f:
+            return json.load(f)
+    if entry.name.endswith('.csv'):
+        return read_text_head(entry.path, size)
+    if size > MAX_TXT_SIZE:
+        return f"<truncated {size} bytes>"
+    with open(entry.path, "r") as f:
+        return f.read()
 
 def load_experiment_data(experiment_dir):
     """Load all necessary data for paper generation."""
@@ -16,34 +162,30 @@ def load_experiment_data(experiment_dir):
     with open(os.path.join(experiment_dir, "idea.json"), "r") as f:
         idea = json.load(f)
     
-    # Load experiment summaries from logs
-    summaries = {}
+    # Load experiment summaries from logs and any experiment results or data
+    # files; reads are I/O bound, so they run on a thread pool
     logs_dir = os.path.join(experiment_dir, "logs")
-    if os.path.exists(logs_dir):
-        for log_file in os.listdir(logs_dir):
-            if log_file.endswith('.json'):
-                try:
-                    with open(os.path.join(logs_dir, log_file), "r") as f:
-                        log_data = json.load(f)
-                        summaries[log_file] = log_data
-                except:
-                    pass
-    
-    # Load any experiment results or data files
     data_dir = os.path.join(experiment_dir, "data")
+    log_entries = scan_files(logs_dir, '.json')
+    data_entries = scan_files(data_dir, ('.json', '.txt', '.csv'))
+    summaries = {}
     data_files = {}
-    if os.path.exists(data_dir):
-        for data_file in os.listdir(data_dir):
-            if data_file.endswith(('.json', '.txt', '.csv')):
-                try:
-                    file_path = os.path.join(data_dir, data_file)
-                    with open(file_path, "r") as f:
-                        if data_file.endswith('.json'):
-                            data_files[data_file] = json.load(f)
-                        else:
-                            data_files[data_file] = f.read()
-                except:
-                    pass
+    with ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS) as ex:
+        futures = {
+            ex.submit(read_data_entry, entry): (target, entry.name)
+            for target, entries in ((summaries, log_entries), (data_files, data_entries))
+            for entry in entries
+        }
+        results = {}
+        for fut in as_completed(futures):
+            try:
+                results[fut] = fut.result()
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Skipping {futures[fut][1]}: {e}")
+    # Fill in scan order so the result does not depend on completion order
+    for fut, (target, name) in futures.items():
+        if fut in results:
+            target[name] = results[fut]
     
     # Load plot aggregator code
     agg_file = os.path.join(experiment_dir, "auto_plot_aggregator.py")
@@ -55,11 +197,7 @@ def load_experiment_data(experiment_dir):
     
     # List available plots
     figures_dir = os.path.join(experiment_dir, "figures")
-    plot_list = []
-    if os.path.exists(figures_dir):
-        for file in os.listdir(figures_dir):
-            if file.endswith(('.png', '.pdf', '.jpg', '.jpeg')):
-                plot_list.append(file)
+    plot_list = list_files(figures_dir, ('.png', '.pdf', '.jpg', '.jpeg'))
     
     # Load cached citations if available
     citations = {}
@@ -72,8 +210,8 @@ def load_experiment_data(experiment_dir):
     
     return idea, summaries, aggregator_code, plot_list, data_files, citations_content
 
-def generate_section(client, model, section_name, context, current_latex=""):
-    """Generate a specific section of the paper with full context of previous sections."""
+def generate_section(client, model, section_name, context, section_recaps=None, cache=None, experiment_data=None):
+    """Generate a specific section of the paper given recaps of previous sections."""
     
     section_prompts = {
         "header": """Generate the complete LaTeX document header and abstract. Include:
@@ -134,14 +272,29 @@ IMPORTANT: Reference ALL available plots using \\includegraphics and proper capt
 Return ONLY the LaTeX code for Discussion, Conclusion, and document ending."""
     }
 
-    # Build the system message with full context and previous sections
+    # Build the system message with full context and previous sections. The
+    # context prefix is identical across calls so provider prefix caching hits.
+    recaps = "\n".join(
+        f"- {name}: {recap}" for name, recap in (section_recaps or {}).items()
+    ) or "None yet"
+    # Only the entries most relevant to this section's task are included.
+    section_data = (
+        experiment_data.for_section(
+            section_name, f"{section_name.replace('_', ' ')} {section_prompts[section_name]}"
+        )
+        if experiment_data is not None
+        else "None provided"
+    )
     system_message = f"""You are an expert academic writer generating a high-quality 4-page ICBINB workshop paper about SO-NEAT (Self-Organizing NeuroEvolution of Augmenting Topologies).
 
 COMPLETE EXPERIMENTAL CONTEXT:
 {context}
 
-PAPER WRITTEN SO FAR (maintain consistency and flow):
-{current_latex}
+EXPERIMENTAL DATA RELEVANT TO THIS SECTION:
+{section_data}
+
+PREVIOUS SECTIONS (recaps, maintain consistency and flow):
+{recaps}
 
 YOUR TASK: {section_prompts[section_name]}
 
@@ -159,6 +312,10 @@ CRITICAL REQUIREMENTS:
 
     prompt = f"Generate the {section_name} section based on the experimental context and data provided. Ensure it integrates seamlessly with the existing document structure."
 
+    response = cache.get(model, prompt, system_message) if cache is not None else None
+    if response is not None:
+        return response
+
     response, _ = get_response_from_llm(
         prompt=prompt,
         client=client,
@@ -167,41 +324,89 @@ CRITICAL REQUIREMENTS:
         temperature=0.2  # Lower temperature for more focused, consistent output
     )
     
-    # Clean the response to extract just the LaTeX code
-    if "```latex" in response:
-        import re
-        latex_match = re.search(r"```latex\s*(.*?)\s*```", response, re.DOTALL)
-        if latex_match:
-            response = latex_match.group(1).strip()
+    # Clean the response to extract just the LaTeX code, otherwise remove
+    # any stray code block markers
+    latex_match = _LATEX_FENCE_RE.search(response)
+    if latex_match:
+        response = latex_match.group(1).strip()
     elif "```" in response:
-        # Remove any code block markers
-        response = re.sub(r"```\w*\n?", "", response).strip()
+        response = _FENCE_MARKER_RE.sub("", response).strip()
     
     # Remove any accidentally generated invalid LaTeX environments
-    import re
-    response = re.sub(r'\\begin\{LaTeX\}\s*', '', response)
-    response = re.sub(r'\\end\{LaTeX\}\s*', '', response)
-    
+    response = _LATEX_ENV_RE.sub("", response)
+
+    if cache is not None:
+        cache.set(model, prompt, system_message, response)
     return response
 
+def summarize_section(client, model, section_name, latex):
+    """Produce a two-sentence recap of a generated section."""
+    recap, _ = get_response_from_llm(
+        prompt=f"Summarize the following {section_name} section of a paper in at most two sentences. Mention any key claims, results, or figure/label names later sections should stay consistent with.\n\n{latex}",
+        client=client,
+        model=model,
+        system_message="You write terse, factual recaps of LaTeX paper sections.",
+        temperature=0.2,
+    )
+    return " ".join(recap.split())
+
+async def generate_section_async(
+    semaphore, client, model, section_name, context, section_recaps=None, cache=None, experiment_data=None
+):
+    """Run generate_section in a worker thread, bounded by ``semaphore``."""
+    async with semaphore:
+        return await asyncio.to_thread(
+            generate_section, client, model, section_name, context, section_recaps, cache, experiment_data
+        )
+
+async def summarize_section_async(semaphore, client, model, section_name, latex):
+    """Run summarize_section in a worker thread, bounded by ``semaphore``."""
+    async with semaphore:
+        return await asyncio.to_thread(
+            summarize_section, client, model, section_name, latex
+        )
+
+def load_section_checkpoint(sections_dir, section_name):
+    """Return (latex, recap) saved by an earlier run, or None."""
+    tex_path = os.path.join(sections_dir, f"{section_name}.tex")
+    recap_path = os.path.join(sections_dir, f"{section_name}.recap.txt")
+    try:
+        with open(tex_path, "r") as f:
+            latex = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        with open(recap_path, "r") as f:
+            recap = f.read()
+    except FileNotFoundError:
+        recap = None
+    return latex, recap
+
+def save_section_checkpoint(sections_dir, section_name, suffix, text):
+    """Atomically write ``<section_name><suffix>`` under ``sections_dir``."""
+    os.makedirs(sections_dir, exist_ok=True)
+    path = os.path.join(sections_dir, f"{section_name}{suffix}")
+    with open(path + ".tmp", "w") as f:
+        f.write(text)
+    os.replace(path + ".tmp", path)
+
 def combine_sections(sections, experiment_dir):
     """Combine all sections into a complete LaTeX document."""
     
     # Read the blank template to get the proper header structure
     blank_template_path = os.path.join(experiment_dir, "latex", "template.tex")
     
-    # Start with a proper LaTeX document structure
-    full_document = sections["header"]
-    
-    # Add each section
-    for section in ["introduction", "related_work", "methods", "experiments", "conclusion"]:
-        if section in sections:
-            full_document += "\n\n" + sections[section]
+    # Start with a proper LaTeX document structure, then add each section
+    parts = [sections["header"]] + [
+        sections[section]
+        for section in ("introduction", "related_work", "methods", "experiments", "conclusion")
+        if section in sections
+    ]
     
     # Write the complete document
     output_path = os.path.join(experiment_dir, "latex", "template.tex")
     with open(output_path, "w") as f:
-        f.write(full_document)
+        f.write("\n\n".join(parts))
     
     print(f"✅ Complete paper written to: {output_path}")
     return output_path
@@ -210,6 +415,9 @@ def main():
     parser = argparse.ArgumentParser(description="Generate complete academic paper section by section")
     parser.add_argument("experiment_dir", help="Path to experiment directory")
     parser.add_argument("--model", default="deepseek-reasoner", help="Model to use for generation")
+    parser.add_argument("--model_recap", default="deepseek-chat", help="Cheap model used to recap finished sections")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Maximum number of concurrent section LLM calls")
+    parser.add_argument("--force-regenerate", action="store_true", help="Ignore sections and cached responses from earlier runs")
     args = parser.parse_args()
     
     print(f"🚀 Generating complete paper for: {args.experiment_dir}")
@@ -228,10 +436,6 @@ Full Idea Text: {idea.get('idea_text', '')}
 EXPERIMENTAL DATA:
 Available plots: {', '.join(plot_list)}
 
-Experiment summaries: {json.dumps(summaries, indent=2) if summaries else 'No summaries available'}
-
-Data files: {json.dumps(data_files, indent=2) if data_files else 'No data files available'}
-
 PLOT GENERATION CODE:
 {aggregator_code}
 
@@ -242,25 +446,95 @@ FIGURES AVAILABLE FOR REFERENCE:
 {chr(10).join(f"- {plot}" for plot in plot_list)}
 """
     
-    # Create client
-    client, model = create_client(args.model)
-    
-    # Generate each section
-    sections = {}
-    current_latex = ""
+    # Create clients once; both share one keep-alive pool
+    http_client = create_http_client()
+    client, model = create_client(args.model, http_client=http_client)
+    recap_client, recap_model = create_client(args.model_recap, http_client=http_client)
+    # Finished sections are checkpointed to .sections/ so a rerun resumes
+    sections_dir = os.path.join(args.experiment_dir, ".sections")
+    cache_dir = os.path.join(args.experiment_dir, ".section_cache")
+    if args.force_regenerate:
+        shutil.rmtree(sections_dir, ignore_errors=True)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    # Exact-match only: a section is reused only when its full context is unchanged
+    cache = PromptCache(cache_dir, label="Section")
+    experiment_data = ExperimentData(summaries, data_files)
     
+    # Generate sections in dependency groups; sections within a group only
+    # see the shared context plus recaps of earlier groups.
     section_order = ["header", "introduction", "related_work", "methods", "experiments", "conclusion"]
-    
-    for section in section_order:
-        print(f"📝 Generating {section} section...")
-        print(f"📏 Current document length: {len(current_latex)} characters")
-        try:
-            sections[section] = generate_section(client, model, section, context, current_latex)
-            current_latex += "\n\n" + sections[section]
-            print(f"✅ {section} section completed ({len(sections[section])} chars)")
-        except Exception as e:
-            print(f"❌ Error generating {section}: {e}")
-            continue
+    section_groups = [
+        {"header": False},
+        {"introduction": False, "related_work": False, "methods": False},
+        {"experiments": True},
+        {"conclusion": True},
+    ]
+    sections = {}
+    section_recaps = {}
+
+    async def run_pipeline():
+        semaphore = asyncio.Semaphore(args.max_concurrency)
+        for group in section_groups:
+            previous = {s: section_recaps[s] for s in section_order if s in section_recaps}
+            pending = {}
+            for section, needs_recaps in group.items():
+                checkpoint = load_section_checkpoint(sections_dir, section)
+                if checkpoint is None:
+                    pending[section] = needs_recaps
+                    continue
+                sections[section], recap = checkpoint
+                if recap is not None:
+                    section_recaps[section] = recap
+                print(f"♻️ Resumed {section} section from {sections_dir}")
+            if not pending:
+                continue
+            print(f"📝 Generating {', '.join(pending)} section(s)...")
+            results = await asyncio.gather(
+                *(
+                    generate_section_async(
+                        semaphore,
+                        client,
+                        model,
+                        section,
+                        context,
+                        previous if needs_recaps else None,
+                        cache=cache,
+                        experiment_data=experiment_data,
+                    )
+                    for section, needs_recaps in pending.items()
+                ),
+                return_exceptions=True,
+            )
+            for section, result in zip(pending, results):
+                if isinstance(result, Exception):
+                    print(f"❌ Error generating {section}: {result}")
+                    continue
+                sections[section] = result
+                save_section_checkpoint(sections_dir, section, ".tex", result)
+                print(f"✅ {section} section completed ({len(result)} chars)")
+            finished = [s for s in group if s in sections and s not in section_recaps]
+            recaps = await asyncio.gather(
+                *(
+                    summarize_section_async(
+                        semaphore, recap_client, recap_model, s, sections[s]
+                    )
+                    for s in finished
+                ),
+                return_exceptions=True,
+            )
+            for section, recap in zip(finished, recaps):
+                if isinstance(recap, Exception):
+                    print(f"⚠️ Could not recap {section}: {recap}")
+                    recap = " ".join(sections[section][:300].split())
+                else:
+                    save_section_checkpoint(sections_dir, section, ".recap.txt", recap)
+                section_recaps[section] = recap
+
+    try:
+        asyncio.run(run_pipeline())
+    finally:
+        if http_client is not None:
+            http_client.close()
     
     # Combine all sections
     print("🔗 Combining sections into complete document...")
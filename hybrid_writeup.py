@@ -10,7 +10,11 @@ import sys
 import tempfile
 sys.path.append('/home/thunderbird/sakana/AI-Scientist-v2-demo')
 
-from ai_scientist.perform_icbinb_writeup import perform_writeup, gather_citations
+from ai_scientist.perform_icbinb_writeup import perform_writeup
+from ai_scientist.utils.citations_cache import cached_or_gather
+
+# OpenAI model used for VLM figure descriptions
+VLM_MODEL = "gpt-4o-2024-05-13"
 
 def create_hybrid_writeup(experiment_dir, 
                          model_writeup="deepseek-reasoner",
@@ -29,33 +33,12 @@ def create_hybrid_writeup(experiment_dir,
     
     # Step 1: Load or gather citations (using DeepSeek)
     print("Step 1: Gathering citations...")
-    citations_cache_path = os.path.join(experiment_dir, "cached_citations.bib")
-    
-    if os.path.exists(citations_cache_path):
-        try:
-            with open(citations_cache_path, "r") as f:
-                citations_text = f.read()
-            progress_path = os.path.join(experiment_dir, "citations_progress.json")
-            if os.path.exists(progress_path):
-                import json
-                with open(progress_path, "r") as f:
-                    progress = json.load(f)
-                    completed_rounds = progress.get("completed_rounds", 0)
-                print(f"Resuming citation gathering from round {completed_rounds}")
-            print(f"Using DeepSeek API with {model_citation}.")
-        except Exception as e:
-            print(f"Error loading cached citations: {e}")
-            citations_text = None
-    else:
-        citations_text = None
-    
-    if citations_text is None or len(citations_text.strip()) == 0:
-        print("Gathering new citations...")
-        citations_text = gather_citations(
-            experiment_dir, 
-            num_cite_rounds=citation_rounds, 
-            small_model=model_citation
-        )
+    print(f"Using DeepSeek API with {model_citation}.")
+    citations_text = cached_or_gather(
+        experiment_dir,
+        rounds=citation_rounds,
+        small_model=model_citation,
+    )
     
     if citations_text is None:
         print("❌ Citation gathering failed")
@@ -66,13 +49,13 @@ def create_hybrid_writeup(experiment_dir,
     # Step 2: Perform writeup with hybrid models
     print("Step 2: Performing writeup (DeepSeek + OpenAI VLM)...")
     print(f"- Text generation: {model_writeup}")
-    print(f"- VLM figure descriptions: gpt-4o-2024-05-13") 
+    print(f"- VLM figure descriptions: {VLM_MODEL}")
     
     try:
         writeup_success = perform_writeup(
             base_folder=experiment_dir,
             big_model=model_writeup,          # DeepSeek reasoner for main writeup
-            small_model="gpt-4o-2024-05-13", # OpenAI for VLM tasks and citations
+            small_model=VLM_MODEL,           # OpenAI for VLM tasks and citations
             page_limit=4,                     # ICBINB format
             citations_text=citations_text,
             n_writeup_reflections=2           # Reduced reflections for efficiency
@@ -113,7 +96,7 @@ def main():
     print(f"Experiment directory: {experiment_dir}")
     print(f"Writeup model: {model_writeup}")
     print(f"Citation model: {model_citation}")
-    print(f"VLM model: gpt-4o-2024-05-13")
+    print(f"VLM model: {VLM_MODEL}")
     print(f"Citation rounds: {citation_rounds}")
     print("=" * 55)
     
@@ -7,49 +7,41 @@ This version uses OpenAI for VLM (Vision Language Model) processing while using
 import os
 import sys
 import tempfile
+import traceback
 sys.path.append('/home/thunderbird/sakana/AI-Scientist-v2-demo')
 
 def create_no_vlm_writeup(experiment_dir, model_writeup="deepseek-reasoner", model_citation="deepseek-chat", num_cite_rounds=10):
     """
-    Create a writeup without VLM processing by temporarily modifying the VLM function.
+    Create a writeup with DeepSeek for text; figure descriptions still go
+    through the OpenAI VLM (see the module docstring).
     """
-    # First, let's import after adding to path
-    from ai_scientist.perform_icbinb_writeup import perform_writeup, gather_citations
-    import ai_scientist.vlm as vlm_module
-    
     print(f"Rerunning writeup for experiment: {experiment_dir}")
     
-    # Check if experiment directory exists
+    # Check if experiment directory exists before paying for the heavy imports
     if not os.path.exists(experiment_dir):
         print(f"Error: Experiment directory does not exist: {experiment_dir}")
         return False
     
-    # Store original VLM function
-    original_create_client = vlm_module.create_client
+    # Import after adding to path
+    from ai_scientist.perform_icbinb_writeup import perform_writeup, gather_citations
+    from ai_scientist.llm_cache import PromptCache
+    import ai_scientist.perform_icbinb_writeup as writeup_module
+    
+    # Store the original LLM function
+    original_get_response = writeup_module.get_response_from_llm
     
-    # Create a mock VLM client that returns empty descriptions
-    def mock_vlm_client(model):
-        print(f"Skipping VLM processing for model {model} (not supported by DeepSeek)")
-        # Return a mock client and model
-        class MockClient:
-            class chat:
-                class completions:
-                    @staticmethod
-                    def create(**kwargs):
-                        class MockResponse:
-                            class choices:
-                                class message:
-                                    content = '{"caption": "Figure generated from experiment results", "detailed_caption": "This figure shows the experimental results from the SO-NEAT algorithm implementation."}'
-                            choices = [choices()]
-                        return MockResponse()
-        return MockClient(), model
+    # Citation rounds are served from a cache shared across reruns. Keys cover
+    # the model and the full prompt and history: rounds share a long common
+    # prefix, so anything looser would hand round 1's reply to every round
+    citation_cache = PromptCache(
+        os.path.join(experiment_dir, ".cache", "citations"),
+        label="Citation",
+    )
     
     try:
-        # Temporarily replace the VLM client
-        vlm_module.create_client = mock_vlm_client
-        
         # Gather citations first
         print("Step 1: Gathering citations...")
+        writeup_module.get_response_from_llm = citation_cache.wrap(original_get_response)
         try:
             citations_text = gather_citations(
                 base_folder=experiment_dir,
@@ -60,6 +52,8 @@ def create_no_vlm_writeup(experiment_dir, model_writeup="deepseek-reasoner", mod
         except Exception as e:
             print(f"Citation gathering failed: {e}")
             citations_text = ""
+        finally:
+            writeup_module.get_response_from_llm = original_get_response
         
         # Perform writeup
         print("Step 2: Performing writeup (with OpenAI VLM processing)...")
@@ -70,11 +64,10 @@ def create_no_vlm_writeup(experiment_dir, model_writeup="deepseek-reasoner", mod
                 small_model="gpt-4o-2024-05-13",  # OpenAI for VLM tasks
                 page_limit=4,  # ICBINB format
                 citations_text=citations_text,
-                vlm_bypass=False  # Enable VLM processing with OpenAI
+                vlm_max_workers=8,  # Figure descriptions in flight at once
             )
         except Exception as e:
             print(f"❌ Exception during writeup: {e}")
-            import traceback
             traceback.print_exc()
             return False
         
@@ -92,13 +85,8 @@ def create_no_vlm_writeup(experiment_dir, model_writeup="deepseek-reasoner", mod
         
     except Exception as e:
         print(f"Writeup failed with error: {e}")
-        import traceback
         traceback.print_exc()
         return False
-    
-    finally:
-        # Restore original VLM function
-        vlm_module.create_client = original_create_client
     """
     Rerun just the writeup process for an existing experiment.
     """
@@ -147,7 +135,6 @@ def create_no_vlm_writeup(experiment_dir, model_writeup="deepseek-reasoner", mod
         
     except Exception as e:
         print(f"Writeup failed with error: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
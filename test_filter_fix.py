@@ -1,40 +1,57 @@
 #!/usr/bin/env python3
 """
 Test script to verify that the filter_experiment_summaries fix handles various scenarios correctly.
+Run with pytest (add -n auto when pytest-xdist is installed).
 """
 
 import json
-import tempfile
 import os
+import pytest
 from ai_scientist.perform_icbinb_writeup import filter_experiment_summaries, load_exp_summaries
 
 
-def test_filter_with_none_values():
+def write_null_summaries(base_dir):
+    """Create logs/0-run with null summary files (simulating failed experiments)."""
+    logs_dir = os.path.join(base_dir, 'logs', '0-run')
+    os.makedirs(logs_dir, exist_ok=True)
+    for filename in ['baseline_summary.json', 'research_summary.json', 'ablation_summary.json']:
+        with open(os.path.join(logs_dir, filename), 'w') as f:
+            json.dump(None, f)
+    return base_dir
+
+
+@pytest.fixture(scope="module")
+def null_summaries_dir(tmp_path_factory):
+    """Null summaries written once and shared by the tests that only read them."""
+    return write_null_summaries(str(tmp_path_factory.mktemp("null_summaries")))
+
+
+# All summaries None (failed experiments); ablation is only kept for plot_aggregation
+ALL_NONE_SUMMARIES = {
+    'BASELINE_SUMMARY': None,
+    'RESEARCH_SUMMARY': None,
+    'ABLATION_SUMMARY': None
+}
+
+
+def _assert_all_none(d, keys):
+    """Assert d has exactly the given keys and every value is None."""
+    assert d.keys() == set(keys) and all(v is None for v in d.values()), \
+        f"Expected {sorted(keys)} all None, got {d}"
+
+
+@pytest.mark.parametrize('step_name, expected_keys', [
+    ('citation_gathering', ('BASELINE_SUMMARY', 'RESEARCH_SUMMARY')),
+    ('writeup', ('BASELINE_SUMMARY', 'RESEARCH_SUMMARY')),
+    ('plot_aggregation', ('BASELINE_SUMMARY', 'RESEARCH_SUMMARY', 'ABLATION_SUMMARY')),
+])
+def test_filter_with_none_values(step_name, expected_keys):
     """Test filter_experiment_summaries with None values (failed experiments)."""
-    print("=== Testing filter_experiment_summaries with None values ===")
-    
-    exp_summaries = {
-        'BASELINE_SUMMARY': None,
-        'RESEARCH_SUMMARY': None,
-        'ABLATION_SUMMARY': None
-    }
+    print(f"=== Testing filter_experiment_summaries with None values ({step_name}) ===")
     
-    # Test all step types with their expected results
-    test_cases = [
-        ('citation_gathering', {'BASELINE_SUMMARY': None, 'RESEARCH_SUMMARY': None}),
-        ('writeup', {'BASELINE_SUMMARY': None, 'RESEARCH_SUMMARY': None}),
-        ('plot_aggregation', {'BASELINE_SUMMARY': None, 'RESEARCH_SUMMARY': None, 'ABLATION_SUMMARY': None})
-    ]
-    
-    for step_name, expected in test_cases:
-        print(f"Testing step_name: {step_name}")
-        try:
-            result = filter_experiment_summaries(exp_summaries, step_name)
-            print(f"  ✓ Success: {result}")
-            assert result == expected, f"Expected {expected}, got {result}"
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            raise
+    result = filter_experiment_summaries(ALL_NONE_SUMMARIES, step_name)
+    print(f"  ✓ Success: {result}")
+    _assert_all_none(result, expected_keys)
 
 
 def test_filter_with_mixed_values():
@@ -61,73 +78,35 @@ def test_filter_with_mixed_values():
         raise
 
 
-def test_load_exp_summaries_with_null_files():
+def test_load_exp_summaries_with_null_files(null_summaries_dir):
     """Test load_exp_summaries with files containing null values."""
     print("\n=== Testing load_exp_summaries with null JSON files ===")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create logs/0-run directory structure
-        logs_dir = os.path.join(temp_dir, 'logs', '0-run')
-        os.makedirs(logs_dir, exist_ok=True)
-        
-        # Create JSON files with null content
-        for filename in ['baseline_summary.json', 'research_summary.json', 'ablation_summary.json']:
-            filepath = os.path.join(logs_dir, filename)
-            with open(filepath, 'w') as f:
-                json.dump(None, f)
-        
-        try:
-            result = load_exp_summaries(temp_dir)
-            print(f"  ✓ Success: {result}")
-            expected = {'BASELINE_SUMMARY': None, 'RESEARCH_SUMMARY': None, 'ABLATION_SUMMARY': None}
-            assert result == expected
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            raise
+    try:
+        result = load_exp_summaries(null_summaries_dir)
+        print(f"  ✓ Success: {result}")
+        _assert_all_none(result, ALL_NONE_SUMMARIES)
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        raise
 
 
-def test_integration():
+def test_integration(null_summaries_dir):
     """Test the complete integration: load_exp_summaries + filter_experiment_summaries."""
     print("\n=== Testing complete integration ===")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create logs/0-run directory structure
-        logs_dir = os.path.join(temp_dir, 'logs', '0-run')
-        os.makedirs(logs_dir, exist_ok=True)
+    try:
+        # Load experiment summaries
+        exp_summaries = load_exp_summaries(null_summaries_dir)
+        print(f"  Loaded summaries: {exp_summaries}")
         
-        # Create JSON files with null content (simulating failed experiments)
-        for filename in ['baseline_summary.json', 'research_summary.json', 'ablation_summary.json']:
-            filepath = os.path.join(logs_dir, filename)
-            with open(filepath, 'w') as f:
-                json.dump(None, f)
+        # Filter for plot aggregation
+        filtered = filter_experiment_summaries(exp_summaries, 'plot_aggregation')
+        print(f"  ✓ Filtered successfully: {filtered}")
         
-        try:
-            # Load experiment summaries
-            exp_summaries = load_exp_summaries(temp_dir)
-            print(f"  Loaded summaries: {exp_summaries}")
-            
-            # Filter for plot aggregation
-            filtered = filter_experiment_summaries(exp_summaries, 'plot_aggregation')
-            print(f"  ✓ Filtered successfully: {filtered}")
-            
-            expected = {'BASELINE_SUMMARY': None, 'RESEARCH_SUMMARY': None, 'ABLATION_SUMMARY': None}
-            assert filtered == expected
-            
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            raise
-
-
-if __name__ == "__main__":
-    try:
-        test_filter_with_none_values()
-        test_filter_with_mixed_values()
-        test_load_exp_summaries_with_null_files()
-        test_integration()
-        print("\n🎉 All tests passed! The fix is working correctly.")
+        _assert_all_none(filtered, ALL_NONE_SUMMARIES)
         
     except Exception as e:
-        print(f"\n❌ Test failed: {e}")
-        import traceback
-        traceback.print_exc()
-        exit(1)
+        print(f"  ✗ Error: {e}")
+        raise
+